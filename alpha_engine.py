@@ -148,7 +148,7 @@ class AlphaMonitor:
         self.kalshi_connected: bool = False
         self.kalshi_ticker: dict[str, dict] = {}
         self.kalshi_orderbook: dict[str, dict] = {}
-        self._kalshi_ob_ts: dict[str, float] = {}  # last update timestamp per ticker
+        self._kalshi_ob_ts: dict[str, float] = {}  # last update (monotonic) per ticker
         self.kalshi_fills: list[dict] = []
         self._kalshi_subscribed_ob: set[str] = set()
         self._kalshi_ws = None
@@ -435,7 +435,7 @@ class AlphaMonitor:
                                         "yes": msg.get("yes", []),
                                         "no": msg.get("no", []),
                                     }
-                                    self._kalshi_ob_ts[ticker] = time.time()
+                                    self._kalshi_ob_ts[ticker] = time.monotonic()
 
                             elif msg_type == "orderbook_delta":
                                 ticker = msg.get("market_ticker", "")
@@ -454,7 +454,7 @@ class AlphaMonitor:
                                         self.kalshi_orderbook[ticker][side] = [
                                             [p, q] for p, q in book_dict.items()
                                         ]
-                                    self._kalshi_ob_ts[ticker] = time.time()
+                                    self._kalshi_ob_ts[ticker] = time.monotonic()
 
                             elif msg_type == "fill":
                                 self.kalshi_fills.append(msg)
@@ -521,8 +521,8 @@ class AlphaMonitor:
         ob = self.kalshi_orderbook.get(ticker)
         if not ob:
             return None
-        last_ts = self._kalshi_ob_ts.get(ticker, 0)
-        if time.time() - last_ts > max_age:
+        last_ts = self._kalshi_ob_ts.get(ticker)
+        if last_ts is None or time.monotonic() - last_ts > max_age:
             return None  # Stale — let caller fall back to REST
         return ob
 
@@ -144,13 +144,16 @@ TUNABLE_FIELDS = {
 }
 
 
+TUNABLES_VERSION = 0  # bumped whenever set_tunables / restore_tunables change values
+
+
 def get_tunables() -> dict:
     return {k: getattr(__import__(__name__), k) for k in TUNABLE_FIELDS}
 
 
 def set_tunables(updates: dict) -> dict:
     import config as _self
-    from database import set_setting
+    from database import set_settings
     applied = {}
     for key, value in updates.items():
         spec = TUNABLE_FIELDS.get(key)
@@ -164,10 +167,13 @@ def set_tunables(updates: dict) -> dict:
             elif spec["type"] == "float":
                 value = max(spec["min"], min(spec["max"], float(value)))
             setattr(_self, key, value)
-            set_setting(f"config_{key}", str(value))
             applied[key] = value
         except (ValueError, TypeError):
             continue
+    # Persist the whole batch in one transaction
+    set_settings({f"config_{k}": str(v) for k, v in applied.items()})
+    if applied:
+        _self.TUNABLES_VERSION += 1
     return applied
 
 
@@ -188,6 +194,7 @@ def restore_tunables():
                 setattr(_self, key, float(saved))
         except (ValueError, TypeError):
             continue
+    _self.TUNABLES_VERSION += 1
 
 
 def switch_env(env: str):
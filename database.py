@@ -1,6 +1,8 @@
 import os
+import queue
 import sqlite3
 import json
+import threading
 from datetime import datetime, timezone
 from contextlib import contextmanager
 
@@ -12,25 +14,95 @@ else:
     DB_PATH = "kalshibot.db"
 
 
-def _connect():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
+_READER_POOL_SIZE = 4
+
+# One long-lived writer connection (SQLite allows a single writer anyway) plus
+# a small pool of read-only connections. Under WAL, readers never block the
+# writer and vice versa, so dashboard queries don't stall log/snapshot writes.
+_writer_conn: sqlite3.Connection | None = None
+_writer_lock = threading.RLock()
+_readers: queue.Queue = queue.Queue(maxsize=_READER_POOL_SIZE)
+
+
+def _connect(readonly: bool = False):
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    conn.execute("PRAGMA busy_timeout=5000")
+    if readonly:
+        conn.execute("PRAGMA query_only=ON")
+    else:
+        # WAL + synchronous=NORMAL: one fsync per checkpoint instead of per commit
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA journal_size_limit=6144000")
     return conn
 
 
+def _rows(conn):
+    """Cursor returning sqlite3.Row results — only read helpers need named columns."""
+    cur = conn.cursor()
+    cur.row_factory = sqlite3.Row
+    return cur
+
+
 @contextmanager
 def get_db():
-    conn = _connect()
+    """Check out the shared writer connection. Commits on success, rolls back on error."""
+    global _writer_conn
+    with _writer_lock:
+        if _writer_conn is None:
+            _writer_conn = _connect()
+        conn = _writer_conn
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+
+@contextmanager
+def get_db_ro():
+    """Check out a read-only connection from the reader pool."""
+    try:
+        conn = _readers.get_nowait()
+    except queue.Empty:
+        conn = _connect(readonly=True)
     try:
         yield conn
-        conn.commit()
     finally:
-        conn.close()
+        try:
+            _readers.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+# Bump when the schema below changes so existing databases re-run the script
+SCHEMA_VERSION = "2"
+_schema_checked = False
+
+
+def _schema_ready(conn) -> bool:
+    """Return True if the database already has the current schema version."""
+    has_settings = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'settings'"
+    ).fetchone()
+    if not has_settings:
+        return False
+    row = _rows(conn).execute(
+        "SELECT value FROM settings WHERE key = 'schema_version'"
+    ).fetchone()
+    return row is not None and row["value"] == SCHEMA_VERSION
 
 
 def init_db():
+    """Create tables on first use. Later calls in the same process are no-ops."""
+    global _schema_checked
+    if _schema_checked:
+        return
     with get_db() as conn:
+        if _schema_ready(conn):
+            _schema_checked = True
+            return
         conn.executescript("""
             CREATE TABLE IF NOT EXISTS trades (
                 id          INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -99,7 +171,20 @@ def init_db():
                 hold_duration_s REAL,
                 entry_price_cents INTEGER
             );
+            CREATE TABLE IF NOT EXISTS paper_positions (
+                ticker                TEXT PRIMARY KEY,
+                side                  TEXT NOT NULL,
+                quantity              INTEGER NOT NULL,
+                avg_price_cents       REAL NOT NULL,
+                market_exposure_cents REAL NOT NULL
+            );
         """)
+        conn.execute(
+            "INSERT INTO settings (key, value) VALUES ('schema_version', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (SCHEMA_VERSION,),
+        )
+    _schema_checked = True
 
 
 def log_event(level: str, message: str):
@@ -110,19 +195,39 @@ def log_event(level: str, message: str):
         )
 
 
-def record_trade(market_id: str, side: str, action: str, price: float,
-                  quantity: int, order_id: str | None = None, exit_type: str | None = None):
-    """Record a trade with optional exit type (SL, TP, SETTLE for sell actions)."""
+def _trade_row(ts: str, market_id: str, side: str, action: str, price: float,
+               quantity: int, order_id: str | None = None, exit_type: str | None = None) -> tuple:
     # For sell actions, use exit_type in the action field for better labeling
     if action in ("SELL", "SETTLED") and exit_type:
         action = exit_type
+    return (ts, market_id, side, action, price, quantity, order_id)
+
+
+_INSERT_TRADE = (
+    "INSERT INTO trades (ts, market_id, side, action, price, quantity, order_id) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def record_trade(market_id: str, side: str, action: str, price: float,
+                  quantity: int, order_id: str | None = None, exit_type: str | None = None):
+    """Record a trade with optional exit type (SL, TP, SETTLE for sell actions)."""
+    row = _trade_row(datetime.now(timezone.utc).isoformat(), market_id, side, action,
+                     price, quantity, order_id, exit_type)
     with get_db() as conn:
-        conn.execute(
-            "INSERT INTO trades (ts, market_id, side, action, price, quantity, order_id) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (datetime.now(timezone.utc).isoformat(), market_id, side, action,
-             price, quantity, order_id),
-        )
+        conn.execute(_INSERT_TRADE, row)
+
+
+def record_trade_many(trades: list[dict], ts: str | None = None):
+    """Record several trades (record_trade keyword dicts) in a single transaction.
+
+    ts stamps every row; pass it to share a timestamp with companion snapshots.
+    """
+    if not trades:
+        return
+    ts = ts or datetime.now(timezone.utc).isoformat()
+    with get_db() as conn:
+        conn.executemany(_INSERT_TRADE, [_trade_row(ts, **t) for t in trades])
 
 
 def record_decision(market_id: str | None, decision: str, confidence: float,
@@ -137,8 +242,8 @@ def record_decision(market_id: str | None, decision: str, confidence: float,
 
 
 def get_recent_logs(limit: int = 50) -> list[dict]:
-    with get_db() as conn:
-        rows = conn.execute(
+    with get_db_ro() as conn:
+        rows = _rows(conn).execute(
             "SELECT ts, level, message FROM logs ORDER BY id DESC LIMIT ?",
             (limit,),
         ).fetchall()
@@ -146,16 +251,16 @@ def get_recent_logs(limit: int = 50) -> list[dict]:
 
 
 def get_recent_trades(limit: int = 20) -> list[dict]:
-    with get_db() as conn:
-        rows = conn.execute(
+    with get_db_ro() as conn:
+        rows = _rows(conn).execute(
             "SELECT * FROM trades ORDER BY id DESC LIMIT ?", (limit,)
         ).fetchall()
     return [dict(r) for r in rows]
 
 
 def get_latest_decision() -> dict | None:
-    with get_db() as conn:
-        row = conn.execute(
+    with get_db_ro() as conn:
+        row = _rows(conn).execute(
             "SELECT * FROM agent_decisions ORDER BY id DESC LIMIT 1"
         ).fetchone()
     return dict(row) if row else None
@@ -163,8 +268,8 @@ def get_latest_decision() -> dict | None:
 
 def get_todays_trades() -> list[dict]:
     today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    with get_db() as conn:
-        rows = conn.execute(
+    with get_db_ro() as conn:
+        rows = _rows(conn).execute(
             "SELECT * FROM trades WHERE ts LIKE ? ORDER BY id DESC",
             (f"{today}%",),
         ).fetchall()
@@ -181,8 +286,8 @@ def _trades_from_snapshots(mode: str = "") -> tuple:
         mode_filter = "WHERE market_id LIKE '[PAPER]%'"
     elif mode == "live":
         mode_filter = "WHERE market_id NOT LIKE '[PAPER]%'"
-    with get_db() as conn:
-        rows = conn.execute(
+    with get_db_ro() as conn:
+        rows = _rows(conn).execute(
             f"SELECT ts, market_id, side, action, price_cents, quantity, pnl_cents "
             f"FROM trade_snapshots {mode_filter} ORDER BY id DESC"
         ).fetchall()
@@ -237,19 +342,19 @@ def get_trades_with_pnl(limit: int = 0, mode: str = "") -> dict:
     By default returns ALL trades (limit=0). Pass a positive limit to cap results.
     mode: "paper" = only [PAPER] trades, "live" = only non-[PAPER] trades, "" = all.
     """
-    with get_db() as conn:
+    with get_db_ro() as conn:
         where = ""
         if mode == "paper":
             where = "WHERE market_id LIKE '[PAPER]%'"
         elif mode == "live":
             where = "WHERE market_id NOT LIKE '[PAPER]%'"
         if limit > 0:
-            rows = conn.execute(
+            rows = _rows(conn).execute(
                 f"SELECT ts, market_id, side, action, price, quantity FROM trades {where} ORDER BY id DESC LIMIT ?",
                 (limit,),
             ).fetchall()
         else:
-            rows = conn.execute(
+            rows = _rows(conn).execute(
                 f"SELECT ts, market_id, side, action, price, quantity FROM trades {where} ORDER BY id DESC",
             ).fetchall()
 
@@ -332,15 +437,27 @@ _SNAPSHOT_COLS = [
 ]
 
 
+_INSERT_SNAPSHOT = (
+    f"INSERT INTO trade_snapshots ({', '.join(_SNAPSHOT_COLS)}) "
+    f"VALUES ({', '.join('?' * len(_SNAPSHOT_COLS))})"
+)
+
+
 def record_snapshot(snapshot: dict):
     """Record a trade context snapshot. Missing keys default to None."""
     values = [snapshot.get(c) for c in _SNAPSHOT_COLS]
-    placeholders = ", ".join("?" * len(_SNAPSHOT_COLS))
-    col_names = ", ".join(_SNAPSHOT_COLS)
     with get_db() as conn:
-        conn.execute(
-            f"INSERT INTO trade_snapshots ({col_names}) VALUES ({placeholders})",
-            values,
+        conn.execute(_INSERT_SNAPSHOT, values)
+
+
+def record_snapshot_many(snapshots: list[dict]):
+    """Record several trade context snapshots in a single transaction."""
+    if not snapshots:
+        return
+    with get_db() as conn:
+        conn.executemany(
+            _INSERT_SNAPSHOT,
+            [[s.get(c) for c in _SNAPSHOT_COLS] for s in snapshots],
         )
 
 
@@ -354,7 +471,7 @@ def get_completed_snapshots(limit: int = 0, mode: str = "") -> list[dict]:
         mode_filter = "AND e.market_id LIKE '[PAPER]%'"
     elif mode == "live":
         mode_filter = "AND e.market_id NOT LIKE '[PAPER]%'"
-    with get_db() as conn:
+    with get_db_ro() as conn:
         query = f"""
             SELECT e.*,
                    b.btc_price       AS entry_btc_price,
@@ -376,18 +493,23 @@ def get_completed_snapshots(limit: int = 0, mode: str = "") -> list[dict]:
               AND e.pnl_cents IS NOT NULL
               {mode_filter}
             ORDER BY e.id DESC
+            LIMIT ?
         """
-        if limit > 0:
-            query += f" LIMIT {limit}"
-        rows = conn.execute(query).fetchall()
+        # SQLite treats a negative LIMIT as "no limit"
+        rows = _rows(conn).execute(query, (limit if limit > 0 else -1,)).fetchall()
     return [dict(r) for r in rows]
 
 
 def get_entry_snapshot(market_id: str) -> dict | None:
-    """Look up the BUY snapshot for a market (for computing exit P&L and hold duration)."""
-    with get_db() as conn:
-        row = conn.execute(
-            "SELECT ts, price_cents FROM trade_snapshots "
+    """Look up the BUY snapshot for a market (for computing exit P&L and hold duration).
+
+    ts_epoch is the entry time as Unix seconds, converted by SQLite's julianday()
+    so callers don't need to parse the ISO string.
+    """
+    with get_db_ro() as conn:
+        row = _rows(conn).execute(
+            "SELECT ts, price_cents, (julianday(ts) - 2440587.5) * 86400.0 AS ts_epoch "
+            "FROM trade_snapshots "
             "WHERE market_id = ? AND action = 'BUY' ORDER BY id DESC LIMIT 1",
             (market_id,),
         ).fetchone()
@@ -399,9 +521,9 @@ def get_all_unsettled_live_entries() -> list[dict]:
 
     Used for backfilling settlement records for historical trades.
     """
-    with get_db() as conn:
+    with get_db_ro() as conn:
         # Get all live-mode market_ids with BUY snapshots
-        buy_markets = conn.execute(
+        buy_markets = _rows(conn).execute(
             "SELECT DISTINCT market_id FROM trade_snapshots "
             "WHERE action = 'BUY' AND market_id NOT LIKE '[PAPER]%'"
         ).fetchall()
@@ -416,7 +538,7 @@ def get_all_unsettled_live_entries() -> list[dict]:
             ).fetchone()
             if has_exit:
                 continue
-            entry = conn.execute(
+            entry = _rows(conn).execute(
                 "SELECT ts, market_id, price_cents, side, quantity, position_qty "
                 "FROM trade_snapshots "
                 "WHERE market_id = ? AND action = 'BUY' ORDER BY id DESC LIMIT 1",
@@ -437,7 +559,7 @@ def backfill_buy_trades_from_snapshots() -> list[str]:
     backfilled = []
     with get_db() as conn:
         # Find live markets in trades table that have SETTLE but no BUY
-        settle_markets = conn.execute(
+        settle_markets = _rows(conn).execute(
             "SELECT DISTINCT market_id FROM trades "
             "WHERE action IN ('SETTLE', 'SETTLED', 'SL', 'TP', 'EDGE') "
             "AND market_id NOT LIKE '[PAPER]%'"
@@ -453,7 +575,7 @@ def backfill_buy_trades_from_snapshots() -> list[str]:
                 continue
 
             # Get BUY snapshots for this market
-            buy_snaps = conn.execute(
+            buy_snaps = _rows(conn).execute(
                 "SELECT ts, market_id, side, price_cents, quantity FROM trade_snapshots "
                 "WHERE market_id = ? AND action = 'BUY' ORDER BY id",
                 (mid,),
@@ -478,7 +600,7 @@ def get_unsettled_entry(market_id: str) -> dict | None:
 
     Used to detect live positions that expired without an active exit.
     """
-    with get_db() as conn:
+    with get_db_ro() as conn:
         has_exit = conn.execute(
             "SELECT 1 FROM trade_snapshots WHERE market_id = ? "
             "AND action IN ('SELL', 'SL', 'TP', 'SETTLE', 'SETTLED', 'EDGE') LIMIT 1",
@@ -486,7 +608,7 @@ def get_unsettled_entry(market_id: str) -> dict | None:
         ).fetchone()
         if has_exit:
             return None
-        row = conn.execute(
+        row = _rows(conn).execute(
             "SELECT ts, price_cents, side, quantity, position_qty FROM trade_snapshots "
             "WHERE market_id = ? AND action = 'BUY' ORDER BY id DESC LIMIT 1",
             (market_id,),
@@ -502,76 +624,144 @@ def get_legacy_round_trips(mode: str = "") -> list[dict]:
     entry_price_cents, quantity.
     mode: "paper" = only [PAPER] trades, "live" = only non-[PAPER] trades, "" = all.
     """
-    with get_db() as conn:
-        where = ""
-        if mode == "paper":
-            where = "WHERE market_id LIKE '[PAPER]%'"
-        elif mode == "live":
-            where = "WHERE market_id NOT LIKE '[PAPER]%'"
-        rows = conn.execute(
-            f"SELECT ts, market_id, side, action, price, quantity FROM trades {where} ORDER BY id"
-        ).fetchall()
+    where = ""
+    if mode == "paper":
+        where = "WHERE market_id LIKE '[PAPER]%'"
+    elif mode == "live":
+        where = "WHERE market_id NOT LIKE '[PAPER]%'"
+    # One pass in SQLite: window functions pick the first BUY and the last exit
+    # per market, GROUP BY sums cost/proceeds. Markets missing either side are
+    # dropped by HAVING.
+    with get_db_ro() as conn:
+        rows = _rows(conn).execute(f"""
+            WITH t AS (
+                SELECT id, ts, market_id, side, action, price, quantity,
+                       action = 'BUY' AS is_buy,
+                       action IN ('SELL', 'SL', 'TP', 'SETTLE', 'SETTLED', 'EDGE') AS is_exit
+                FROM trades {where}
+            ),
+            ranked AS (
+                SELECT *,
+                       ROW_NUMBER() OVER (PARTITION BY market_id, is_buy, is_exit ORDER BY id) AS rn_first,
+                       ROW_NUMBER() OVER (PARTITION BY market_id, is_buy, is_exit ORDER BY id DESC) AS rn_last
+                FROM t
+            )
+            SELECT market_id,
+                   MAX(CASE WHEN is_buy AND rn_first = 1 THEN side END)   AS side,
+                   MAX(CASE WHEN is_buy AND rn_first = 1 THEN price END)  AS entry_price,
+                   MAX(CASE WHEN is_exit AND rn_last = 1 THEN action END) AS exit_action,
+                   SUM(CASE WHEN is_buy THEN price * quantity END)        AS buy_cost,
+                   SUM(CASE WHEN is_exit THEN price * quantity END)       AS sell_proceeds,
+                   SUM(CASE WHEN is_buy THEN quantity END)                AS total_qty,
+                   COALESCE((julianday(MAX(CASE WHEN is_exit AND rn_last = 1 THEN ts END))
+                             - julianday(MAX(CASE WHEN is_buy AND rn_first = 1 THEN ts END))) * 86400.0,
+                            0.0)                                          AS hold_s
+            FROM ranked
+            GROUP BY market_id
+            HAVING buy_cost IS NOT NULL AND sell_proceeds IS NOT NULL
+            ORDER BY MIN(id)
+        """).fetchall()
+
+    return [
+        {
+            "market_id": r["market_id"],
+            "side": r["side"],
+            "action": r["exit_action"],
+            "price_cents": round(r["entry_price"] * 100),
+            "entry_price_cents": round(r["entry_price"] * 100),
+            "quantity": r["total_qty"],
+            "pnl_cents": round((r["sell_proceeds"] - r["buy_cost"]) * 100, 2),
+            "hold_duration_s": r["hold_s"],
+        }
+        for r in rows
+    ]
 
-    trades_list = [dict(r) for r in rows]
 
-    # Group by market_id
-    markets: dict[str, list] = {}
-    for t in trades_list:
-        mid = t["market_id"]
-        markets.setdefault(mid, []).append(t)
+def get_setting(key: str, default: str | None = None) -> str | None:
+    with get_db_ro() as conn:
+        row = _rows(conn).execute(
+            "SELECT value FROM settings WHERE key = ?", (key,)
+        ).fetchone()
+    return row["value"] if row else default
 
-    results = []
-    for mid, market_trades in markets.items():
-        buys = [t for t in market_trades if t["action"] == "BUY"]
-        exits = [t for t in market_trades
-                 if t["action"] in ("SELL", "SL", "TP", "SETTLE", "SETTLED", "EDGE")]
 
-        if not buys or not exits:
-            continue
+def get_settings(keys: list[str] | tuple[str, ...]) -> dict[str, str]:
+    """Fetch several settings in one query; missing keys are omitted."""
+    if not keys:
+        return {}
+    placeholders = ", ".join("?" * len(keys))
+    with get_db_ro() as conn:
+        rows = conn.execute(
+            f"SELECT key, value FROM settings WHERE key IN ({placeholders})", tuple(keys)
+        ).fetchall()
+    return dict(rows)
 
-        buy = buys[0]
-        exit_trade = exits[-1]
 
-        buy_cost = sum(t["price"] * t["quantity"] for t in buys)
-        sell_proceeds = sum(t["price"] * t["quantity"] for t in exits)
-        total_qty = sum(t["quantity"] for t in buys)
-        pnl_dollars = sell_proceeds - buy_cost
+def set_setting(key: str, value: str):
+    with get_db() as conn:
+        conn.execute(
+            "INSERT INTO settings (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
 
-        # Hold duration from timestamps
-        hold_s = 0.0
-        try:
-            buy_ts = datetime.fromisoformat(buy["ts"])
-            exit_ts = datetime.fromisoformat(exit_trade["ts"])
-            hold_s = (exit_ts - buy_ts).total_seconds()
-        except Exception:
-            pass
-
-        results.append({
-            "market_id": mid,
-            "side": buy["side"],
-            "action": exit_trade["action"],
-            "price_cents": round(buy["price"] * 100),
-            "entry_price_cents": round(buy["price"] * 100),
-            "quantity": total_qty,
-            "pnl_cents": round(pnl_dollars * 100, 2),
-            "hold_duration_s": hold_s,
-        })
 
-    return results
+def set_settings(items: dict[str, str]):
+    """Upsert several settings in a single transaction."""
+    if not items:
+        return
+    with get_db() as conn:
+        conn.executemany(
+            "INSERT INTO settings (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            items.items(),
+        )
 
 
-def get_setting(key: str, default: str | None = None) -> str | None:
-    with get_db() as conn:
-        row = conn.execute(
-            "SELECT value FROM settings WHERE key = ?", (key,)
-        ).fetchone()
-    return row["value"] if row else default
+def get_paper_positions() -> dict[str, dict]:
+    """Return persisted paper positions as {ticker: {side, quantity, avg_price_cents, market_exposure_cents}}."""
+    with get_db_ro() as conn:
+        rows = _rows(conn).execute(
+            "SELECT ticker, side, quantity, avg_price_cents, market_exposure_cents "
+            "FROM paper_positions"
+        ).fetchall()
+    return {
+        r["ticker"]: {
+            "side": r["side"],
+            "quantity": r["quantity"],
+            "avg_price_cents": r["avg_price_cents"],
+            "market_exposure_cents": r["market_exposure_cents"],
+        }
+        for r in rows
+    }
 
 
-def set_setting(key: str, value: str):
+def save_paper_state(balance: float, last_ticker: str, positions: dict[str, dict | None],
+                     replace_all: bool = False):
+    """Persist paper balance, last ticker and changed positions in one transaction.
+
+    positions maps ticker -> position dict (upserted) or None (deleted), so only
+    rows that actually changed are rewritten. replace_all clears the table first.
+    """
     with get_db() as conn:
-        conn.execute(
+        conn.executemany(
             "INSERT INTO settings (key, value) VALUES (?, ?) "
             "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
-            (key, value),
+            (("paper_balance", str(balance)), ("paper_last_ticker", last_ticker)),
         )
+        if replace_all:
+            conn.execute("DELETE FROM paper_positions")
+        for ticker, pos in positions.items():
+            if pos is None:
+                conn.execute("DELETE FROM paper_positions WHERE ticker = ?", (ticker,))
+                continue
+            conn.execute(
+                "INSERT INTO paper_positions "
+                "(ticker, side, quantity, avg_price_cents, market_exposure_cents) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(ticker) DO UPDATE SET side = excluded.side, "
+                "quantity = excluded.quantity, avg_price_cents = excluded.avg_price_cents, "
+                "market_exposure_cents = excluded.market_exposure_cents",
+                (ticker, pos["side"], pos["quantity"], pos["avg_price_cents"],
+                 pos["market_exposure_cents"]),
+            )
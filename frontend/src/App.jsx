@@ -1,5 +1,6 @@
 import { usePolling } from './hooks/usePolling'
-import { fetchStatus, fetchLogs, fetchTrades } from './api'
+import { useStatusStream } from './hooks/useStatusStream'
+import { fetchLogs, fetchTrades } from './api'
 import Header from './components/Header'
 import ContractCard from './components/ContractCard'
 import BotStatus from './components/BotStatus'
@@ -13,7 +14,7 @@ import LogPanel from './components/LogPanel'
 import AnalyticsPanel from './components/AnalyticsPanel'
 
 export default function App() {
-  const { data: status, refresh: refreshStatus } = usePolling(fetchStatus, 2000)
+  const { data: status, refresh: refreshStatus } = useStatusStream()
   const { data: logs } = usePolling(fetchLogs, 3000)
   const tradeMode = status?.paper_mode ? 'paper' : 'live'
   const { data: tradeData } = usePolling(() => fetchTrades(tradeMode), 5000)
@@ -5,6 +5,10 @@ export async function fetchStatus() {
   return res.json();
 }
 
+export function openStatusStream() {
+  return new EventSource(`${BASE}/api/status/stream`);
+}
+
 export async function fetchLogs() {
   const res = await fetch(`${BASE}/api/logs`);
   return res.json();
@@ -0,0 +1,32 @@
+import { useState, useEffect, useCallback } from 'react';
+import { fetchStatus, openStatusStream } from '../api';
+
+// Status pushed over SSE (only when it changes); refresh() does a one-off fetch
+// for callers that just changed bot state and want it reflected immediately.
+export function useStatusStream() {
+  const [data, setData] = useState(null);
+  const [error, setError] = useState(null);
+
+  const refresh = useCallback(async () => {
+    try {
+      const result = await fetchStatus();
+      setData(result);
+      setError(null);
+    } catch (err) {
+      setError(err);
+    }
+  }, []);
+
+  useEffect(() => {
+    const source = openStatusStream();
+    source.onmessage = (event) => {
+      setData(JSON.parse(event.data));
+      setError(null);
+    };
+    // EventSource reconnects on its own; just surface the error meanwhile
+    source.onerror = (err) => setError(err);
+    return () => source.close();
+  }, []);
+
+  return { data, error, refresh };
+}
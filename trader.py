@@ -4,6 +4,8 @@ import json
 import re
 import time
 from datetime import datetime, timezone
+from functools import lru_cache
+from operator import itemgetter
 from typing import Any
 
 import httpx
@@ -12,7 +14,15 @@ from cryptography.hazmat.primitives.asymmetric import padding
 
 import config
 from agent import MarketAgent
-from database import init_db, log_event, record_trade, record_decision, record_snapshot, get_entry_snapshot, get_unsettled_entry, get_setting, set_setting
+from database import init_db, log_event, record_trade, record_decision, get_entry_snapshot, get_unsettled_entry, get_setting, get_settings, set_setting, get_paper_positions, save_paper_state, record_trade_many, record_snapshot_many
+
+# Prefer orjson for decoding API responses (several times faster than stdlib json)
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
 
 
 def _load_private_key():
@@ -27,36 +37,105 @@ def _load_private_key():
         return serialization.load_pem_private_key(f.read(), password=None)
 
 
-def _sign_request(private_key, method: str, path: str) -> dict:
-    """Build Kalshi auth headers with RSA-PSS signature.
+# Kalshi API keys are RSA only (no Ed25519), so keep PSS but build the padding
+# and hash objects once instead of on every signature.
+_PSS_PADDING = padding.PSS(
+    mgf=padding.MGF1(hashes.SHA256()),
+    salt_length=padding.PSS.DIGEST_LENGTH,
+)
+_SHA256 = hashes.SHA256()
+
+# Dollar amount in market titles, e.g. "Price to beat: $83,873.07"
+_STRIKE_CHARS = "0123456789,."
+_STRIKE_RE = re.compile(r'\$([0-9,.]+)')
+
+
+def _make_signer(private_key):
+    """Return a cached RSA-PSS signer bound to private_key.
+
+    Burst requests in the same millisecond (balance + positions + orderbook)
+    sign identical messages, so the signature is reused instead of re-running
+    the RSA private-key op. The timestamp is part of the key, so entries go
+    stale on their own once the clock moves on.
+    """
+    key_sign = private_key.sign
+
+    @lru_cache(maxsize=64)
+    def sign(timestamp_ms: str, method: str, clean_path: str) -> str:
+        message = f"{timestamp_ms}{method}{clean_path}".encode("utf-8")
+        return base64.b64encode(key_sign(message, _PSS_PADDING, _SHA256)).decode("utf-8")
+
+    return sign
+
+
+# Orderbook levels are [price, qty] pairs; itemgetter keeps the unpacking in C
+_price = itemgetter(0)
+_qty = itemgetter(1)
+
+
+def _side(ob: dict, key: str) -> list | tuple:
+    """Return one side's levels, or () if missing/malformed — a single dict lookup."""
+    levels = ob.get(key)
+    return levels if isinstance(levels, list) else ()
+
+
+def top_of_book(ob: dict) -> tuple[int, int, int, int]:
+    """Return (best_yes_bid, best_yes_ask, yes_depth, no_depth) for an orderbook.
 
-    Signs: {timestamp_ms}{METHOD}{path_without_query}
+    Kalshi may return levels in any order, so each side is scanned once and the
+    result memoised on the dict under "_top". The memo is keyed on the identity
+    of the level lists: REST fetches build fresh dicts and the WS delta handler
+    swaps in new lists, so a changed book never hits a stale entry.
     """
-    timestamp_ms = str(int(time.time() * 1000))
-    clean_path = path.split("?")[0]
-    message = f"{timestamp_ms}{method}{clean_path}".encode("utf-8")
-
-    signature = private_key.sign(
-        message,
-        padding.PSS(
-            mgf=padding.MGF1(hashes.SHA256()),
-            salt_length=padding.PSS.DIGEST_LENGTH,
-        ),
-        hashes.SHA256(),
+    raw_yes, raw_no = ob.get("yes"), ob.get("no")
+    cached = ob.get("_top")
+    if cached is not None and cached[0] is raw_yes and cached[1] is raw_no:
+        return cached[2]
+    yes_orders = raw_yes if isinstance(raw_yes, list) else ()
+    no_orders = raw_no if isinstance(raw_no, list) else ()
+    top = (
+        max(map(_price, yes_orders)) if yes_orders else 0,
+        (100 - max(map(_price, no_orders))) if no_orders else 100,
+        sum(map(_qty, yes_orders)),
+        sum(map(_qty, no_orders)),
     )
+    ob["_top"] = (raw_yes, raw_no, top)
+    return top
 
-    return {
-        "Content-Type": "application/json",
-        "KALSHI-ACCESS-KEY": config.KALSHI_API_KEY_ID,
-        "KALSHI-ACCESS-TIMESTAMP": timestamp_ms,
-        "KALSHI-ACCESS-SIGNATURE": base64.b64encode(signature).decode("utf-8"),
-    }
+
+def _escalation_price(attempt: int, side: str, cur_bid: int, cur_ask: int) -> int:
+    """Retry price for attempt 1-3: midpoint, 2/3 toward the ask, then cross the spread.
+
+    cur_bid/cur_ask are YES prices; NO retries work in NO-price space
+    (NO bid = 100 - YES ask, NO ask = 100 - YES bid).
+    """
+    if side == "yes":
+        bid, ask = cur_bid, cur_ask
+    else:
+        bid, ask = 100 - cur_ask, 100 - cur_bid
+    gap = ask - bid
+    if attempt == 1:
+        price = bid + (gap + 1) // 2
+    elif attempt == 2:
+        price = bid + (gap * 2) // 3
+    else:
+        price = ask
+    return max(1, min(99, price))
 
 
 class TradingBot:
     """Async trading engine for Kalshi BTC 15-min binary markets."""
 
     PATH_PREFIX = "/trade-api/v2"
+    _SETTLE_CONCURRENCY = 4  # max concurrent market-result fetches during settlement
+    _SETTLED_STATUSES = ("settled", "finalized")  # market states where result is final
+    # Waits between live result polls: sparse until ~45s after close, tight around
+    # the usual ~60s settlement, then widening for stragglers (~2 min total)
+    _LIVE_SETTLE_WAITS = (45, 10, 5, 5, 10, 15, 30)
+    _WRITE_BATCH = 50     # max queued trade/snapshot rows per write-behind flush
+    _WRITE_LINGER = 0.2   # seconds to wait for more rows before flushing
+    _HTTP_CONCURRENCY = 8   # max Kalshi requests in flight (HTTP/2 streams aren't pool-capped)
+    _RETRY_AFTER_MAX = 10.0  # cap on a server-requested 429 backoff, in seconds
 
     def __init__(self, alpha_monitor=None):
         init_db()
@@ -69,24 +148,37 @@ class TradingBot:
         self.agent = MarketAgent()
         self.alpha = alpha_monitor
         self.running = False
-        self.http: httpx.AsyncClient | None = None
-        self.private_key = _load_private_key()
+        self._stop_event = asyncio.Event()  # wakes run() from its poll sleep on stop()
+        self._run_task: asyncio.Task | None = None
+        self.http: httpx.AsyncClient | None = self._new_client()
+        self._http_sem = asyncio.Semaphore(self._HTTP_CONCURRENCY)
+        self._load_credentials()
         self._active_env = config.KALSHI_ENV
+        self.paper_mode: bool = config.KALSHI_ENV == "demo"  # kept in sync by switch_environment
         self._start_balance: float | None = None  # set on first cycle
         self._start_exposure: float = 0.0        # open position cost at start
         self._free_rolled: set[str] = set()      # tickers where we already sold half
         self._took_profit: set[str] = set()      # tickers where we've taken profit (prevent re-entry)
-        self._edge_exit_ts: dict[str, float] = {}   # ticker -> timestamp of last edge-exit
-        self._entry_ts: dict[str, float] = {}        # ticker -> timestamp of entry
+        self._edge_exit_ts: dict[str, float] = {}   # ticker -> monotonic time of last edge-exit
+        self._entry_ts: dict[str, float] = {}        # ticker -> monotonic time of entry
         self._entry_edge: dict[str, float] = {}      # ticker -> edge at entry (cents)
+        self._entry_snaps: dict[str, dict] = {}      # market_id -> {ts_epoch, price_cents} of last BUY
         self._edge_exits_count: dict[str, int] = {}  # ticker -> number of edge-exits this contract
+        self._close_time_cache: dict[str, datetime] = {}  # ticker -> parsed close time
+        self._strike_cache: dict[str, float] = {}         # ticker -> extracted strike
+        self._write_queue: asyncio.Queue = asyncio.Queue()  # ("trade"|"snapshot", row) for _drain_writes
+        self._writer_task: asyncio.Task | None = None
 
         # Paper trading state (used in demo/paper mode)
         self._paper_balance: float = config.PAPER_STARTING_BALANCE
         self._paper_positions: dict[str, dict] = {}  # ticker -> {side, quantity, avg_price_cents, market_exposure_cents}
+        self._paper_positions_view: list[dict] | None = None  # fetch_positions() shape, rebuilt on change
         self._paper_trades: list[dict] = []
         self._last_paper_ticker: str | None = None
+        self._save_task: asyncio.Task | None = None  # pending debounced paper-state flush
+        self._save_seq: int = 0  # bumped by every _save_paper_state call
         self._paper_orderbook: dict | None = None  # latest orderbook snapshot for realistic paper fills
+        self._paper_book: dict[str, tuple] = {"yes": (), "no": ()}  # same levels, best price first
 
         # Live state exposed to the dashboard
         self.status: dict[str, Any] = {
@@ -118,19 +210,47 @@ class TradingBot:
     def base_host(self) -> str:
         return config.KALSHI_HOST
 
-    @property
-    def paper_mode(self) -> bool:
-        return config.KALSHI_ENV == "demo"
+    def _save_paper_state(self, *tickers: str, replace_all: bool = False):
+        """Persist paper balance and positions to DB so state survives restarts.
+
+        Only the given tickers' position rows are written (deleted if the
+        position is gone); replace_all rewrites the whole table.
+        """
+        self._paper_positions_view = None
+        self._save_seq += 1
+        if replace_all:
+            tickers = tuple(self._paper_positions)
+        save_paper_state(
+            self._paper_balance,
+            self._last_paper_ticker or "",
+            {t: self._paper_positions.get(t) for t in tickers},
+            replace_all=replace_all,
+        )
 
-    def _save_paper_state(self):
-        """Persist paper balance and positions to DB so state survives restarts."""
-        set_setting("paper_balance", str(self._paper_balance))
-        set_setting("paper_positions", json.dumps(self._paper_positions))
-        set_setting("paper_last_ticker", self._last_paper_ticker or "")
+    def _schedule_paper_state_save(self):
+        """Coalesce repeated saves into one write ~0.5s later, off the event loop."""
+        if self._save_task and not self._save_task.done():
+            return
+        self._save_task = asyncio.create_task(self._flush_paper_state())
+
+    async def _flush_paper_state(self):
+        await asyncio.sleep(0.5)
+        # Snapshot on the loop thread; the worker must not read live bot state
+        seq = self._save_seq
+        balance, ticker = self._paper_balance, self._last_paper_ticker or ""
+        try:
+            await asyncio.to_thread(save_paper_state, balance, ticker, {})
+            if self._save_seq != seq:
+                # A synchronous save ran meanwhile and may have committed first;
+                # rewrite so our older snapshot can't be the last one on disk
+                self._save_paper_state()
+        except Exception as exc:
+            log_event("ERROR", f"Paper state save failed: {exc}")
 
     def _restore_paper_state(self):
         """Restore paper trading state from DB after a restart."""
-        saved_balance = get_setting("paper_balance")
+        saved = get_settings(("paper_balance", "paper_positions", "paper_last_ticker"))
+        saved_balance = saved.get("paper_balance")
         if saved_balance is not None:
             try:
                 self._paper_balance = float(saved_balance)
@@ -138,16 +258,22 @@ class TradingBot:
             except ValueError:
                 pass
 
-        saved_positions = get_setting("paper_positions")
-        if saved_positions:
-            try:
-                self._paper_positions = json.loads(saved_positions)
-                if self._paper_positions:
-                    log_event("INFO", f"Restored {len(self._paper_positions)} paper position(s)")
-            except (json.JSONDecodeError, ValueError):
-                pass
+        self._paper_positions = get_paper_positions()
+        self._paper_positions_view = None
+        if not self._paper_positions:
+            # One-time migration from the old JSON blob setting
+            saved_positions = saved.get("paper_positions")
+            if saved_positions:
+                try:
+                    self._paper_positions = _json_loads(saved_positions)
+                    self._save_paper_state(replace_all=True)
+                    set_setting("paper_positions", "")
+                except ValueError:  # json and orjson decode errors both subclass ValueError
+                    pass
+        if self._paper_positions:
+            log_event("INFO", f"Restored {len(self._paper_positions)} paper position(s)")
 
-        saved_ticker = get_setting("paper_last_ticker")
+        saved_ticker = saved.get("paper_last_ticker")
         if saved_ticker:
             self._last_paper_ticker = saved_ticker
 
@@ -158,25 +284,20 @@ class TradingBot:
         self._last_paper_ticker = None
         self._start_balance = None
         self._start_exposure = 0.0
-        self._save_paper_state()
+        self._save_paper_state(replace_all=True)
         log_event("INFO", f"Paper trading reset — balance: ${config.PAPER_STARTING_BALANCE:.2f}")
 
     async def switch_environment(self, env: str):
         """Switch between 'demo' and 'live'. Stops the bot, swaps creds, resets client."""
-        was_running = self.running
-        if was_running:
-            self.stop()
-            # Give the loop a moment to exit
-            await asyncio.sleep(1)
+        await self.stop_and_wait()
 
         config.switch_env(env)
-        self.private_key = _load_private_key()
+        self._load_credentials()
         self._active_env = env
+        self.paper_mode = env == "demo"
 
         # Force new HTTP client on next request
-        if self.http and not self.http.is_closed:
-            await self.http.aclose()
-        self.http = None
+        await self.close()
 
         self.status["env"] = env
         self.status["balance"] = 0.0
@@ -199,39 +320,132 @@ class TradingBot:
     # HTTP helpers (Kalshi REST API via httpx + RSA-PSS auth)
     # ------------------------------------------------------------------
 
+    def _new_client(self) -> httpx.AsyncClient:
+        # Keep connections alive across poll intervals (httpx default expiry is
+        # 5s, shorter than a cycle) and multiplex concurrent calls over HTTP/2.
+        # Pool is capped so settlement/reconcile fan-out can't open unbounded sockets.
+        return httpx.AsyncClient(
+            base_url=self.base_host,
+            timeout=httpx.Timeout(30.0, connect=15.0),
+            limits=httpx.Limits(max_connections=8, max_keepalive_connections=4, keepalive_expiry=60.0),
+            http2=True,
+        )
+
     async def _ensure_client(self):
         if self.http is None or self.http.is_closed:
-            self.http = httpx.AsyncClient(
-                base_url=self.base_host,
-                timeout=httpx.Timeout(30.0, connect=15.0),
-            )
+            self.http = self._new_client()
+
+    async def close(self):
+        """Close the shared HTTP client (on environment switch or shutdown)."""
+        await self.flush_writes()
+        if self.http and not self.http.is_closed:
+            await self.http.aclose()
+        self.http = None
+
+    # ------------------------------------------------------------------
+    # Write-behind queue for trade/snapshot rows off the trading path
+    # ------------------------------------------------------------------
+
+    def _queue_write(self, kind: str, row: dict):
+        """Queue a record_trade kwargs dict ("trade") or snapshot dict ("snapshot")."""
+        self._write_queue.put_nowait((kind, row))
+        self._ensure_writer()
+
+    def _ensure_writer(self):
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._drain_writes())
+
+    async def flush_writes(self):
+        """Wait until every queued row has been written (for read-after-write callers)."""
+        if not self._write_queue.empty():
+            self._ensure_writer()
+        await self._write_queue.join()
+
+    async def _drain_writes(self):
+        """Flush queued rows in batches: wait for one, linger briefly for more."""
+        queue = self._write_queue
+        while True:
+            batch = [await queue.get()]
+            deadline = time.monotonic() + self._WRITE_LINGER
+            while len(batch) < self._WRITE_BATCH:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._write_batch(batch)
+            for _ in batch:
+                queue.task_done()
+
+    async def _write_batch(self, batch: list[tuple[str, dict]]):
+        trades = [row for kind, row in batch if kind == "trade"]
+        snapshots = [row for kind, row in batch if kind == "snapshot"]
+
+        def write():
+            record_trade_many(trades)
+            record_snapshot_many(snapshots)
+
+        try:
+            await asyncio.to_thread(write)
+        except Exception as exc:
+            log_event("ERROR", f"Write-behind flush of {len(batch)} row(s) failed: {exc}")
+
+    def _load_credentials(self):
+        """Load the private key and build the signer + static auth headers once per key."""
+        self.private_key = _load_private_key()
+        self._signer = _make_signer(self.private_key)
+        self._static_headers = {
+            "Content-Type": "application/json",
+            "KALSHI-ACCESS-KEY": config.KALSHI_API_KEY_ID,
+        }
+
+    def _sign_request(self, method: str, path: str) -> dict:
+        """Build Kalshi auth headers with RSA-PSS signature.
 
-    def _full_path(self, path: str) -> str:
-        """Prepend the API prefix to a relative path."""
-        return f"{self.PATH_PREFIX}{path}"
+        Signs: {timestamp_ms}{METHOD}{path_without_query}
+        """
+        timestamp_ms = str(int(time.time() * 1000))
+        q = path.find("?")
+        clean_path = path if q < 0 else path[:q]
+        headers = self._static_headers.copy()
+        headers["KALSHI-ACCESS-TIMESTAMP"] = timestamp_ms
+        headers["KALSHI-ACCESS-SIGNATURE"] = self._signer(timestamp_ms, method, clean_path)
+        return headers
 
     async def _request(self, method: str, path: str, **kwargs) -> dict:
-        """HTTP request with automatic retry on transient network errors."""
-        full = self._full_path(path)
+        """HTTP request with automatic retry on transient network errors and 429s."""
+        full = self.PATH_PREFIX + path
         for attempt in range(3):
             await self._ensure_client()
-            headers = _sign_request(self.private_key, method, full)
+            headers = self._sign_request(method, full)
             try:
-                resp = await self.http.request(method, full, headers=headers, **kwargs)
+                async with self._http_sem:
+                    resp = await self.http.request(method, full, headers=headers, **kwargs)
+                if resp.status_code == 429 and attempt < 2:
+                    wait = self._retry_after(resp, 2 ** attempt)
+                    log_event("ERROR", f"429 on {method} {path} — retry {attempt+1}/2 in {wait:g}s")
+                    await asyncio.sleep(wait)
+                    continue
                 resp.raise_for_status()
-                return resp.json()
+                return _json_loads(resp.content)
             except (httpx.ConnectTimeout, httpx.ReadTimeout, httpx.ConnectError) as exc:
                 if attempt < 2:
                     wait = 2 ** attempt  # 1s, 2s
                     log_event("ERROR", f"{type(exc).__name__} on {method} {path} — retry {attempt+1}/2 in {wait}s")
                     await asyncio.sleep(wait)
-                    # Force a fresh connection on retry
-                    if self.http and not self.http.is_closed:
-                        await self.http.aclose()
-                    self.http = None
                 else:
                     raise
 
+    def _retry_after(self, resp: httpx.Response, default: float) -> float:
+        """Seconds to back off on a 429: the Retry-After header if numeric, capped."""
+        try:
+            wait = float(resp.headers.get("Retry-After", default))
+        except ValueError:
+            wait = default
+        return min(max(wait, 0.0), self._RETRY_AFTER_MAX)
+
     async def _get(self, path: str, params: dict | None = None) -> dict:
         return await self._request("GET", path, params=params)
 
@@ -272,13 +486,25 @@ class TradingBot:
         if not markets:
             return None
 
+        # Close time and strike only change per contract — drop cache entries
+        # for markets that are no longer listed, parse only new ones
+        listed = {m.get("ticker", "") for m in markets}
+        for cache in (self._close_time_cache, self._strike_cache):
+            for stale in cache.keys() - listed:
+                del cache[stale]
+
         now = datetime.now(timezone.utc)
         candidates = []
         for m in markets:
-            close_str = m.get("close_time") or m.get("expected_expiration_time")
-            if not close_str:
-                continue
-            close_time = datetime.fromisoformat(close_str.replace("Z", "+00:00"))
+            ticker = m.get("ticker", "")
+            close_time = self._close_time_cache.get(ticker)
+            if close_time is None:
+                close_str = m.get("close_time") or m.get("expected_expiration_time")
+                if not close_str:
+                    continue
+                close_time = datetime.fromisoformat(close_str.replace("Z", "+00:00"))
+                if ticker:
+                    self._close_time_cache[ticker] = close_time
             secs_left = (close_time - now).total_seconds()
             if secs_left > 0:
                 m["_seconds_to_close"] = secs_left
@@ -311,15 +537,19 @@ class TradingBot:
 
     async def fetch_positions(self) -> list[dict]:
         if self.paper_mode:
-            return [
-                {
-                    "ticker": ticker,
-                    "position": p["quantity"] if p["side"] == "yes" else -p["quantity"],
-                    "market_exposure": p["market_exposure_cents"],
-                }
-                for ticker, p in self._paper_positions.items()
-                if p["quantity"] > 0
-            ]
+            # Every paper mutation goes through _save_paper_state, which drops
+            # the cached view. Callers treat the returned list as read-only.
+            if self._paper_positions_view is None:
+                self._paper_positions_view = [
+                    {
+                        "ticker": ticker,
+                        "position": p["quantity"] if p["side"] == "yes" else -p["quantity"],
+                        "market_exposure": p["market_exposure_cents"],
+                    }
+                    for ticker, p in self._paper_positions.items()
+                    if p["quantity"] > 0
+                ]
+            return self._paper_positions_view
         data = await self._get("/portfolio/positions", params={"limit": 20})
         return data.get("market_positions", [])
 
@@ -371,62 +601,62 @@ class TradingBot:
             log_event("ERROR", f"Order rejected: {exc.response.text[:200]}")
             return None
 
+    def _set_paper_orderbook(self, ob: dict | None):
+        """Store the latest orderbook and pre-sort its levels for _simulate_fill.
+
+        The book changes at most once per cycle but may be walked several times
+        (entry + retries + exits), so sorting happens here, once per snapshot.
+        """
+        self._paper_orderbook = ob
+        ob = ob or {}
+        self._paper_book = {
+            "yes": tuple(sorted(ob.get("yes") or (), reverse=True)),
+            "no": tuple(sorted(ob.get("no") or (), reverse=True)),
+        }
+
     def _simulate_fill(
-        self, orderbook: dict, action: str, side: str,
+        self, book: dict, action: str, side: str,
         limit_price_cents: int, quantity: int,
     ) -> tuple[int, int, list[tuple[int, int]]]:
         """Walk the orderbook to simulate a realistic fill — crossing fills only.
 
         Exactly mirrors how Kalshi's matching engine works: only fills against
-        resting orders whose price crosses your limit.
+        resting orders whose price crosses your limit. `book` holds each side's
+        levels sorted best (highest) price first, as built by _set_paper_orderbook.
 
         Returns (filled_qty, avg_price_cents, [(price, qty), ...]).
         """
         fill_fraction = config.PAPER_FILL_FRACTION
 
-        # Determine which book side to consume and price interpretation
-        if action == "buy":
-            if side == "yes":
-                raw_levels = orderbook.get("no", [])
-                # NO bid at P → YES available at (100-P); fillable when (100-P) <= limit
-                levels = [
-                    (100 - p, q) for p, q in raw_levels
-                    if p >= (100 - limit_price_cents)
-                ]
-            else:
-                raw_levels = orderbook.get("yes", [])
-                levels = [
-                    (100 - p, q) for p, q in raw_levels
-                    if p >= (100 - limit_price_cents)
-                ]
-        else:  # sell
-            if side == "yes":
-                raw_levels = orderbook.get("yes", [])
-                levels = [(p, q) for p, q in raw_levels if p >= limit_price_cents]
-            else:
-                raw_levels = orderbook.get("no", [])
-                levels = [(p, q) for p, q in raw_levels if p >= limit_price_cents]
-
-        # Sort: buys cheapest-first, sells best-price-first
+        # Buys consume the opposite side (NO bid at P → YES available at 100-P),
+        # sells hit bids on the same side. Either way the best level is the
+        # highest raw price and a level crosses iff raw price >= threshold, so
+        # one descending walk with an early exit covers all four cases.
         if action == "buy":
-            levels.sort(key=lambda x: x[0])
+            book_side = "no" if side == "yes" else "yes"
+            threshold = 100 - limit_price_cents
         else:
-            levels.sort(key=lambda x: x[0], reverse=True)
+            book_side = side
+            threshold = limit_price_cents
+        levels = book.get(book_side, ())
 
         filled = 0
+        cost = 0
         fills = []
-        for price_at_level, qty_at_level in levels:
-            if filled >= quantity:
+        for raw_price, qty_at_level in levels:
+            if raw_price < threshold or filled >= quantity:
                 break
+            price_at_level = 100 - raw_price if action == "buy" else raw_price
             available = max(1, int(qty_at_level * fill_fraction))
             take = min(available, quantity - filled)
             fills.append((price_at_level, take))
             filled += take
+            cost += price_at_level * take
 
         if filled == 0:
             return 0, 0, []
 
-        avg_price = sum(p * q for p, q in fills) / filled
+        avg_price = cost / filled
         return filled, int(round(avg_price)), fills
 
     def _paper_place_order(self, ticker: str, side: str, price_cents: int, quantity: int) -> dict:
@@ -436,7 +666,7 @@ class TradingBot:
             log_event("SIM", f"[PAPER] No orderbook available — skipping buy")
             return None
 
-        filled_qty, avg_price, fills = self._simulate_fill(ob, "buy", side, price_cents, quantity)
+        filled_qty, avg_price, fills = self._simulate_fill(self._paper_book, "buy", side, price_cents, quantity)
         if filled_qty == 0:
             # No crossing fill — order rests on the book (same as live Kalshi behavior).
             # Return a "resting" order so the retry logic can fire and reprice.
@@ -496,7 +726,7 @@ class TradingBot:
             order_id=order_id,
         )
         log_event("SIM", f"[PAPER] BUY {filled_qty}x {side.upper()} @ {avg_price}c on {ticker}{partial_str}{slip_str} (cost ${cost_dollars:.2f}, bal ${self._paper_balance:.2f})")
-        self._save_paper_state()
+        self._save_paper_state(ticker)
 
         return {"order_id": order_id, "status": "filled" if remaining == 0 else "partial", "filled_count": filled_qty, "remaining_count": remaining}
 
@@ -555,7 +785,7 @@ class TradingBot:
         ob = self._paper_orderbook
 
         if ob:
-            filled_qty, avg_price, fills = self._simulate_fill(ob, "sell", side, price_cents, want_qty)
+            filled_qty, avg_price, fills = self._simulate_fill(self._paper_book, "sell", side, price_cents, want_qty)
             if filled_qty == 0:
                 log_event("SIM", f"[PAPER] No liquidity for {exit_type} {side.upper()} @ {price_cents}c on {ticker}")
                 return None
@@ -590,7 +820,7 @@ class TradingBot:
             exit_type=exit_type,
         )
         log_event("SIM", f"[PAPER] {exit_type} {filled_qty}x {side.upper()} @ {avg_price}c on {ticker}{partial_str}{slip_str} (proceeds ${proceeds_dollars:.2f}, bal ${self._paper_balance:.2f})")
-        self._save_paper_state()
+        self._save_paper_state(ticker)
 
         return {"order_id": order_id, "status": "filled" if remaining == 0 else "partial", "filled_count": filled_qty, "remaining_count": remaining}
 
@@ -617,87 +847,132 @@ class TradingBot:
             log_event("ERROR", f"[PAPER] Background settlement failed: {exc}")
 
     async def _do_settle(self, expired_tickers: list[str]):
-        """Inner settlement logic (separated for error handling)."""
-        for ticker in expired_tickers:
-            pos = self._paper_positions.get(ticker)
-            if not pos:
-                continue
-            qty = pos["quantity"]
-            side = pos["side"]
-            exposure_cents = pos["market_exposure_cents"]
+        """Inner settlement logic (separated for error handling).
 
-            # Query Kalshi for the actual market result (may need retries —
-            # Kalshi takes ~60s to settle after close)
-            settle_price = 0
-            result = ""
-            market_data = {}
-            for attempt in range(7):  # try up to 7 times over ~90s (covers 60s settlement)
-                try:
-                    mkt = await self._get(f"/markets/{ticker}")
-                    market_data = mkt.get("market", mkt)
-                    result = market_data.get("result", "")
-                    if result:
-                        break
-                except Exception as exc:
-                    log_event("ERROR", f"[PAPER] Could not fetch result for {ticker} (attempt {attempt+1}): {exc}")
-                if attempt < 6:
-                    await asyncio.sleep(15)
+        Tickers are settled concurrently (each may poll for ~90s); at most
+        _SETTLE_CONCURRENCY result fetches are in flight at once. Settlement
+        rows are collected and written in one batch at the end. A failure on
+        one ticker doesn't cancel the others, and whatever settled is always
+        written (its balance credit has already been applied).
+        """
+        trade_rows: list[dict] = []
+        snapshot_rows: list[dict] = []
+        sem = asyncio.Semaphore(self._SETTLE_CONCURRENCY)
+        try:
+            results = await asyncio.gather(
+                *(self._settle_one(t, sem, trade_rows, snapshot_rows) for t in expired_tickers),
+                return_exceptions=True,
+            )
+            for ticker, res in zip(expired_tickers, results):
+                if isinstance(res, Exception):
+                    log_event("ERROR", f"[PAPER] Settlement failed for {ticker}: {res}")
+        finally:
+            # Balance/positions first: the in-memory credit is already applied,
+            # so a failed row insert must not leave the expired positions on disk
+            try:
+                self._save_paper_state(*expired_tickers)
+            except Exception as exc:
+                log_event("ERROR", f"[PAPER] Paper state save after settlement failed: {exc}")
+            now_iso = datetime.now(timezone.utc).isoformat()
+            try:
+                record_trade_many(trade_rows, ts=now_iso)
+            except Exception as exc:
+                log_event("ERROR", f"[PAPER] Settlement trade write failed: {exc}")
+            for snap in snapshot_rows:
+                snap["ts"] = now_iso
+            try:
+                record_snapshot_many(snapshot_rows)
+            except Exception as exc:
+                log_event("ERROR", f"[PAPER] Settlement snapshot write failed: {exc}")
 
-            if result and result.lower() == side:
-                settle_price = 100
-            elif not result:
-                # Kalshi hasn't settled yet — use projected settlement as fallback
-                if self.alpha and self.alpha.projected_settlement > 0:
-                    strike = self._extract_strike(market_data) if market_data else None
-                    if strike and strike > 0:
-                        yes_wins = self.alpha.projected_settlement >= strike
-                        if (yes_wins and side == "yes") or (not yes_wins and side == "no"):
-                            settle_price = 100
-                        log_event("SIM", f"[PAPER] Using projected settlement ${self.alpha.projected_settlement:.2f} vs strike ${strike:.2f} → {'YES' if yes_wins else 'NO'}")
-                    else:
-                        log_event("SIM", f"[PAPER] Market {ticker} result unknown, no strike — settling at 0")
+    async def _settle_one(self, ticker: str, sem: asyncio.Semaphore,
+                          trade_rows: list[dict], snapshot_rows: list[dict]):
+        """Resolve one expired paper position and queue its settlement rows."""
+        pos = self._paper_positions.get(ticker)
+        if not pos:
+            return
+        qty = pos["quantity"]
+        side = pos["side"]
+        exposure_cents = pos["market_exposure_cents"]
+
+        # Query Kalshi for the actual market result (may need retries —
+        # Kalshi takes ~60s to settle after close)
+        settle_price = 0
+        result = ""
+        market_data = {}
+        # Back off 1, 2, 4 … 30s (~90s total, covers 60s settlement) so a quick
+        # settlement is picked up within seconds instead of a flat 15s step
+        max_attempts = 8
+        for attempt in range(max_attempts):
+            try:
+                async with sem:
+                    mkt = await self._get(f"/markets/{ticker}")
+                market_data = mkt.get("market", mkt)
+                result = market_data.get("result", "")
+                if result:
+                    break
+                if market_data.get("status", "") in self._SETTLED_STATUSES:
+                    break  # Finalized without a result — retrying won't change it
+            except Exception as exc:
+                log_event("ERROR", f"[PAPER] Could not fetch result for {ticker} (attempt {attempt+1}): {exc}")
+            if attempt < max_attempts - 1:
+                await asyncio.sleep(min(30, 2 ** attempt))
+
+        if result and result.lower() == side:
+            settle_price = 100
+        elif not result:
+            # Kalshi hasn't settled yet — use projected settlement as fallback
+            if self.alpha and self.alpha.projected_settlement > 0:
+                strike = self._extract_strike(market_data) if market_data else None
+                if strike and strike > 0:
+                    yes_wins = self.alpha.projected_settlement >= strike
+                    if (yes_wins and side == "yes") or (not yes_wins and side == "no"):
+                        settle_price = 100
+                    log_event("SIM", f"[PAPER] Using projected settlement ${self.alpha.projected_settlement:.2f} vs strike ${strike:.2f} → {'YES' if yes_wins else 'NO'}")
                 else:
-                    log_event("SIM", f"[PAPER] Market {ticker} result unknown, no projection — settling at 0")
+                    log_event("SIM", f"[PAPER] Market {ticker} result unknown, no strike — settling at 0")
+            else:
+                log_event("SIM", f"[PAPER] Market {ticker} result unknown, no projection — settling at 0")
 
-            log_event("SIM", f"[PAPER] Market {ticker} result: {result.upper() if result else 'PROJECTED'}")
+        log_event("SIM", f"[PAPER] Market {ticker} result: {result.upper() if result else 'PROJECTED'}")
 
-            # Credit payout to paper balance
-            payout_cents = settle_price * qty
-            self._paper_balance += payout_cents / 100.0
+        # Credit payout to paper balance
+        payout_cents = settle_price * qty
+        self._paper_balance += payout_cents / 100.0
 
-            pnl_cents = payout_cents - exposure_cents
-            outcome = "WON" if pnl_cents > 0 else "LOST" if pnl_cents < 0 else "BREAK-EVEN"
-            log_event("SIM", f"[PAPER] SETTLED {ticker}: {qty}x {side.upper()} → {outcome} (payout ${payout_cents/100:.2f}, cost ${exposure_cents/100:.2f}, P&L ${pnl_cents/100:+.2f})")
+        pnl_cents = payout_cents - exposure_cents
+        outcome = "WON" if pnl_cents > 0 else "LOST" if pnl_cents < 0 else "BREAK-EVEN"
+        log_event("SIM", f"[PAPER] SETTLED {ticker}: {qty}x {side.upper()} → {outcome} (payout ${payout_cents/100:.2f}, cost ${exposure_cents/100:.2f}, P&L ${pnl_cents/100:+.2f})")
 
-            _settle_order_id = f"paper-settle-{int(time.time() * 1000)}"
-            record_trade(
-                market_id=f"[PAPER] {ticker}",
-                side=side,
-                action="SETTLED",
-                price=settle_price / 100.0,  # cents → dollars (consistent with BUY)
-                quantity=qty,
-                order_id=_settle_order_id,
-                exit_type="SETTLE",
-            )
-            try:
-                _mid = f"[PAPER] {ticker}"
-                _entry = get_entry_snapshot(_mid)
-                _entry_ts = datetime.fromisoformat(_entry["ts"]).timestamp() if _entry else None
-                record_snapshot({
-                    "ts": datetime.now(timezone.utc).isoformat(),
-                    "trade_id": _settle_order_id,
-                    "market_id": _mid, "action": "SETTLE", "side": side,
-                    "price_cents": settle_price, "quantity": qty,
-                    "decision": "SETTLE", "confidence": 0, "trigger_type": "settlement",
-                    "position_qty": qty,
-                    "pnl_cents": pnl_cents,
-                    "hold_duration_s": round(time.time() - _entry_ts, 1) if _entry_ts else None,
-                    "entry_price_cents": _entry["price_cents"] if _entry else None,
-                })
-            except Exception:
-                pass
-            del self._paper_positions[ticker]
-        self._save_paper_state()
+        _settle_order_id = f"paper-settle-{int(time.time() * 1000)}"
+        trade_rows.append(dict(
+            market_id=f"[PAPER] {ticker}",
+            side=side,
+            action="SETTLED",
+            price=settle_price / 100.0,  # cents → dollars (consistent with BUY)
+            quantity=qty,
+            order_id=_settle_order_id,
+            exit_type="SETTLE",
+        ))
+        try:
+            _mid = f"[PAPER] {ticker}"
+            _entry = self._entry_snapshot(_mid)
+            self._entry_snaps.pop(_mid, None)  # position is gone
+            _entry_ts = _entry["ts_epoch"] if _entry else None
+            snapshot_rows.append({
+                "trade_id": _settle_order_id,  # ts stamped once by _do_settle
+                "market_id": _mid, "action": "SETTLE", "side": side,
+                "price_cents": settle_price, "quantity": qty,
+                "decision": "SETTLE", "confidence": 0, "trigger_type": "settlement",
+                "position_qty": qty,
+                "pnl_cents": pnl_cents,
+                "hold_duration_s": round(time.time() - _entry_ts, 1) if _entry_ts else None,
+                "entry_price_cents": _entry["price_cents"] if _entry else None,
+            })
+        except Exception as exc:
+            log_event("ERROR", f"[PAPER] Settlement snapshot for {ticker} failed: {exc}")
+        del self._paper_positions[ticker]
+        self._paper_positions_view = None  # other settle tasks may still be awaiting
 
     async def _settle_live_positions(self, old_ticker: str):
         """Record settlement for live positions that expired without an active exit.
@@ -705,8 +980,9 @@ class TradingBot:
         Mirrors _do_settle for paper mode: queries Kalshi for the market result
         and records a SETTLE trade + snapshot so the trade log shows properly.
         """
+        self._entry_snaps.pop(old_ticker, None)  # contract is over
         try:
-            entry = get_unsettled_entry(old_ticker)
+            entry = await asyncio.to_thread(get_unsettled_entry, old_ticker)
             if not entry:
                 return  # Already has an exit record, or no entry at all
 
@@ -716,20 +992,28 @@ class TradingBot:
             if qty <= 0:
                 return
 
+            # The entry snapshot doesn't depend on the result — read it in a
+            # worker thread while the result is polled below
+            entry_snap = asyncio.create_task(asyncio.to_thread(get_entry_snapshot, old_ticker))
+
             # Query Kalshi for the actual result (retries — settlement takes ~60s)
             settle_price = 0
             result = ""
-            for attempt in range(7):
+            market_data = {}
+            waits = self._LIVE_SETTLE_WAITS
+            for attempt in range(len(waits) + 1):
                 try:
                     mkt = await self._get(f"/markets/{old_ticker}")
                     market_data = mkt.get("market", mkt)
                     result = market_data.get("result", "")
                     if result:
                         break
+                    if market_data.get("status", "") in self._SETTLED_STATUSES:
+                        break  # Finalized without a result — retrying won't change it
                 except Exception as exc:
                     log_event("ERROR", f"[LIVE] Could not fetch result for {old_ticker} (attempt {attempt+1}): {exc}")
-                if attempt < 6:
-                    await asyncio.sleep(15)
+                if attempt < len(waits):
+                    await asyncio.sleep(waits[attempt])
 
             if result and result.lower() == side:
                 settle_price = 100
@@ -748,7 +1032,7 @@ class TradingBot:
             log_event("TRADE", f"[LIVE] SETTLED {old_ticker}: {qty}x {side.upper()} → {outcome} (payout ${payout_cents/100:.2f}, cost ${exposure_cents/100:.2f}, P&L ${pnl_cents/100:+.2f})")
 
             _settle_order_id = f"live-settle-{int(time.time() * 1000)}"
-            record_trade(
+            self._queue_write("trade", dict(
                 market_id=old_ticker,
                 side=side,
                 action="SETTLED",
@@ -756,11 +1040,11 @@ class TradingBot:
                 quantity=qty,
                 order_id=_settle_order_id,
                 exit_type="SETTLE",
-            )
+            ))
             try:
-                _entry = get_entry_snapshot(old_ticker)
-                _entry_ts = datetime.fromisoformat(_entry["ts"]).timestamp() if _entry else None
-                record_snapshot({
+                _entry = await entry_snap
+                _entry_ts = _entry["ts_epoch"] if _entry else None
+                self._queue_write("snapshot", {
                     "ts": datetime.now(timezone.utc).isoformat(),
                     "trade_id": _settle_order_id,
                     "market_id": old_ticker, "action": "SETTLE", "side": side,
@@ -795,16 +1079,14 @@ class TradingBot:
         best_yes_ask: lowest YES ask (derived from NO orders: 100 - best_no_bid).
         If one side is missing, we still allow trading on the available side.
         """
-        yes_orders = orderbook.get("yes", []) if isinstance(orderbook.get("yes"), list) else []
-        no_orders = orderbook.get("no", []) if isinstance(orderbook.get("no"), list) else []
+        yes_orders = _side(orderbook, "yes")
+        no_orders = _side(orderbook, "no")
 
         if not yes_orders and not no_orders:
             log_event("GUARD", "Spread guard: empty orderbook")
             return False, 0, 100
 
-        # Use max() — Kalshi may return levels in any order
-        best_bid = max(p for p, q in yes_orders) if yes_orders else 0
-        best_ask = (100 - max(p for p, q in no_orders)) if no_orders else 100
+        best_bid, best_ask, _, _ = top_of_book(orderbook)
 
         # Two-sided market: enforce max spread
         if yes_orders and no_orders:
@@ -821,7 +1103,18 @@ class TradingBot:
 
         Tries structured fields first (floor_strike / strike_price),
         then falls back to parsing dollar amounts from yes_sub_title or title.
+        Results are cached per ticker (see fetch_active_market for eviction).
         """
+        ticker = market.get("ticker")
+        if ticker in self._strike_cache:
+            return self._strike_cache[ticker]
+        strike = self._parse_strike(market)
+        if ticker and strike is not None:
+            self._strike_cache[ticker] = strike
+        return strike
+
+    @staticmethod
+    def _parse_strike(market: dict) -> float | None:
         strike = market.get("floor_strike") or market.get("strike_price")
         if strike:
             try:
@@ -835,11 +1128,19 @@ class TradingBot:
         # Fall back to parsing dollar amounts from subtitles or title
         # yes_sub_title example: "Price to beat: $83,873.07"
         for field in ("yes_sub_title", "title"):
-            text = market.get(field, "")
-            match = re.search(r'\$([0-9,.]+)', text)
-            if match:
+            text = market.get(field) or ""
+            # Fast path: the run of digits/commas/dots right after the first "$"
+            # (lstrip scans in C). The regex is only needed when that run is empty.
+            _, dollar, tail = text.partition("$")
+            if not dollar:
+                continue
+            amount = tail[:len(tail) - len(tail.lstrip(_STRIKE_CHARS))]
+            if not amount:
+                match = _STRIKE_RE.search(tail)
+                amount = match.group(1) if match else ""
+            if amount:
                 try:
-                    return float(match.group(1).replace(",", ""))
+                    return float(amount.replace(",", ""))
                 except ValueError:
                     pass
         return None
@@ -864,34 +1165,10 @@ class TradingBot:
 
                 # Refresh orderbook (market may have moved)
                 live_ob = self.alpha.get_live_orderbook(ticker) if self.alpha else None
-                self._paper_orderbook = live_ob if live_ob else await self.fetch_orderbook(ticker)
-
-                ob = self._paper_orderbook or {}
-                yes_orders = ob.get("yes", [])
-                no_orders = ob.get("no", [])
-                cur_bid = max((p for p, q in yes_orders), default=0) if yes_orders else 0
-                cur_ask = (100 - max((p for p, q in no_orders), default=0)) if no_orders else 100
-
-                # Escalate: retry 1 → midpoint, retry 2 → 2/3 toward ask, retry 3 → cross spread
-                if side == "yes":
-                    if attempt == 1:
-                        new_price = (cur_bid + cur_ask + 1) // 2      # midpoint
-                    elif attempt == 2:
-                        new_price = cur_bid + ((cur_ask - cur_bid) * 2) // 3  # 2/3
-                    else:
-                        new_price = cur_ask                           # cross spread
-                else:
-                    # For NO: work in no-price space (100 - yes prices)
-                    no_bid = 100 - cur_ask  # best NO bid
-                    no_ask = 100 - cur_bid  # best NO ask
-                    if attempt == 1:
-                        new_price = (no_bid + no_ask + 1) // 2
-                    elif attempt == 2:
-                        new_price = no_bid + ((no_ask - no_bid) * 2) // 3
-                    else:
-                        new_price = no_ask
+                self._set_paper_orderbook(live_ob if live_ob else await self.fetch_orderbook(ticker))
 
-                new_price = max(1, min(99, new_price))
+                cur_bid, cur_ask, _, _ = top_of_book(self._paper_orderbook or {})
+                new_price = _escalation_price(attempt, side, cur_bid, cur_ask)
                 log_event("SIM", f"[PAPER] Retry {attempt}/{max_retries}: {remaining}x {side.upper()} @ {new_price}c (was {price_cents}c)")
                 retry_order = await self.place_order(ticker, side, new_price, remaining)
                 if retry_order:
@@ -923,29 +1200,8 @@ class TradingBot:
                     # Refresh orderbook and escalate toward the spread
                     live_ob = self.alpha.get_live_orderbook(ticker) if self.alpha else None
                     ob = live_ob if live_ob else await self.fetch_orderbook(ticker)
-                    yes_orders = ob.get("yes", []) if isinstance(ob.get("yes"), list) else []
-                    no_orders = ob.get("no", []) if isinstance(ob.get("no"), list) else []
-                    cur_bid = max((p for p, q in yes_orders), default=0) if yes_orders else 0
-                    cur_ask = (100 - max((p for p, q in no_orders), default=0)) if no_orders else 100
-
-                    if side == "yes":
-                        if attempt == 1:
-                            new_price = (cur_bid + cur_ask + 1) // 2
-                        elif attempt == 2:
-                            new_price = cur_bid + ((cur_ask - cur_bid) * 2) // 3
-                        else:
-                            new_price = cur_ask
-                    else:
-                        no_bid = 100 - cur_ask
-                        no_ask = 100 - cur_bid
-                        if attempt == 1:
-                            new_price = (no_bid + no_ask + 1) // 2
-                        elif attempt == 2:
-                            new_price = no_bid + ((no_ask - no_bid) * 2) // 3
-                        else:
-                            new_price = no_ask
-
-                    new_price = max(1, min(99, new_price))
+                    cur_bid, cur_ask, _, _ = top_of_book(ob)
+                    new_price = _escalation_price(attempt, side, cur_bid, cur_ask)
                     retry_order = await self.place_order(ticker, side, new_price, remaining)
                     if retry_order:
                         current_order_id = retry_order.get("order_id", current_order_id)
@@ -967,31 +1223,283 @@ class TradingBot:
     async def run(self):
         self.running = True
         self.status["running"] = True
+        self._stop_event.clear()
+        self._run_task = asyncio.current_task()
         log_event("INFO", "Trading bot started")
 
         try:
             while self.running:
                 await self._cycle()
-                await asyncio.sleep(config.POLL_INTERVAL_SECONDS)
+                # Poll interval, cut short by stop()
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), config.POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
         except asyncio.CancelledError:
             log_event("INFO", "Trading bot cancelled")
         finally:
             self.running = False
             self.status["running"] = False
-            if self.http and not self.http.is_closed:
-                await self.http.aclose()
             log_event("INFO", "Trading bot stopped")
 
+    def _publish_dashboard(
+        self, dashboard: dict, *, ticker: str, balance: float, best_bid: int, best_ask: int,
+        secs_left: float, settled_pnl: float, max_daily_loss: float, total_exposure: float,
+        pos_val: int, pos_exposure: int, mark_to_market: int, strike: float | None,
+        fv: dict | None, now_ts: float, took_profit: bool, free_rolled: bool,
+        edge_exit_age: float | None, entry_ts: float | None, edge_exits: int,
+    ):
+        """Build the guard/exit/config panels and publish the cycle's dashboard.
+
+        Purely observational and all in-memory (no I/O), so _cycle calls it
+        inline; as a task it would only run at the cycle's next await anyway.
+        All inputs are values captured by the cycle.
+        """
+        cfg = config  # bound locally: the panels below read ~50 live thresholds
+        panels = {}
+        has_pos = pos_val != 0
+        current_qty = abs(pos_val)
+        no_ask = 100 - best_bid   # cost to buy NO
+        no_bid = 100 - best_ask   # value of held NO
+        time_factor = min(1.0, max(0.0, secs_left / 900.0)) if secs_left else 0.0
+
+        # Guard states
+        spread_val = best_ask - best_bid
+        max_exposure = balance * cfg.MAX_TOTAL_EXPOSURE_PCT / 100.0
+        price_est = best_ask if best_ask < 100 else 50
+        position_budget = balance * cfg.MAX_POSITION_PCT / 100.0
+        max_qty = max(1, int(position_budget / (price_est / 100.0))) if price_est > 0 else 1
+        secs_shown = round(secs_left or 0, 0)
+
+        panels["guards"] = {
+            "time": {
+                "blocked": secs_left < cfg.MIN_SECONDS_TO_CLOSE if secs_left else True,
+                "value": secs_shown,
+                "threshold": cfg.MIN_SECONDS_TO_CLOSE,
+            },
+            "spread": {
+                "blocked": spread_val > cfg.MAX_SPREAD_CENTS,
+                "value": spread_val,
+                "threshold": cfg.MAX_SPREAD_CENTS,
+            },
+            "daily_loss": {
+                "blocked": settled_pnl < -max_daily_loss,
+                "value": round(settled_pnl, 2),
+                "threshold": round(-max_daily_loss, 2),
+            },
+            "hold_expiry": {
+                "blocked": secs_left < cfg.HOLD_EXPIRY_SECS if secs_left else False,
+                "value": secs_shown,
+                "threshold": cfg.HOLD_EXPIRY_SECS,
+                "has_position": has_pos,
+            },
+            "price_min": {
+                "blocked": best_ask < cfg.MIN_CONTRACT_PRICE and no_ask < cfg.MIN_CONTRACT_PRICE,
+                "value_yes": best_ask,
+                "value_no": no_ask,
+                "threshold": cfg.MIN_CONTRACT_PRICE,
+            },
+            "price_max": {
+                "blocked": best_ask > cfg.MAX_CONTRACT_PRICE and no_ask > cfg.MAX_CONTRACT_PRICE,
+                "value_yes": best_ask,
+                "value_no": no_ask,
+                "threshold": cfg.MAX_CONTRACT_PRICE,
+            },
+            "exposure": {
+                "blocked": total_exposure >= max_exposure,
+                "value": round(total_exposure, 2),
+                "threshold": round(max_exposure, 2),
+            },
+            "position_size": {
+                "blocked": current_qty >= max_qty,
+                "value": current_qty,
+                "threshold": max_qty,
+            },
+            "same_side": {
+                "blocked": False,
+                "holding": "YES" if pos_val > 0 else ("NO" if pos_val < 0 else "NONE"),
+            },
+            "tp_reentry": {
+                "blocked": took_profit,
+            },
+            "edge_reentry": {
+                "blocked": edge_exit_age is not None and edge_exit_age < cfg.EDGE_EXIT_COOLDOWN_SECS if ticker else False,
+                "cooldown_left": max(0, cfg.EDGE_EXIT_COOLDOWN_SECS - edge_exit_age) if ticker and edge_exit_age is not None else 0,
+                "premium": cfg.REENTRY_EDGE_PREMIUM,
+            },
+        }
+
+        # Exit rule states
+        exits = {}
+        if has_pos:
+            eq = current_qty
+            pe = pos_exposure
+            sp = best_bid if pos_val > 0 else no_bid
+            avg_c = pe / eq if eq > 0 else 0
+            loss_p = (pe - mark_to_market) / eq if eq > 0 else 0
+            gain_p = ((sp - avg_c) / avg_c * 100) if avg_c > 0 else 0
+
+            exits["stop_loss"] = {
+                "triggered": cfg.STOP_LOSS_CENTS > 0 and loss_p >= cfg.STOP_LOSS_CENTS,
+                "value": round(loss_p, 1),
+                "threshold": cfg.STOP_LOSS_CENTS,
+            }
+            exits["hit_and_run"] = {
+                "triggered": cfg.HIT_RUN_PCT > 0 and gain_p >= cfg.HIT_RUN_PCT,
+                "value": round(gain_p, 1),
+                "threshold": cfg.HIT_RUN_PCT,
+                "enabled": cfg.HIT_RUN_PCT > 0,
+            }
+            exits["profit_take"] = {
+                "triggered": gain_p >= cfg.PROFIT_TAKE_PCT and secs_left > cfg.PROFIT_TAKE_MIN_SECS,
+                "value": round(gain_p, 1),
+                "threshold": cfg.PROFIT_TAKE_PCT,
+                "min_secs": cfg.PROFIT_TAKE_MIN_SECS,
+            }
+            exits["free_roll"] = {
+                "triggered": sp >= cfg.FREE_ROLL_PRICE and eq >= 2 and not free_rolled,
+                "value": sp,
+                "threshold": cfg.FREE_ROLL_PRICE,
+                "qty": eq,
+                "already_rolled": free_rolled,
+            }
+
+            # Edge-exit dashboard data
+            _edge_remaining = 0
+            _edge_threshold = 0
+            _edge_hold = now_ts - (entry_ts if entry_ts is not None else now_ts)
+            if cfg.EDGE_EXIT_ENABLED and self.alpha and strike and strike > 0:
+                try:
+                    # Reuse the fair value above unless it was skipped (secs_left <= 0)
+                    _fv_edge = fv if fv is not None else self.alpha.get_fair_value(strike, secs_left)
+                    _fair_yes_edge = _fv_edge.get("fair_yes_cents", 0)
+                    if pos_val > 0:
+                        _edge_remaining = _fair_yes_edge - best_bid
+                    else:
+                        _edge_remaining = best_ask - _fair_yes_edge
+                    _edge_threshold = cfg.EDGE_EXIT_THRESHOLD_CENTS * time_factor
+                except Exception:
+                    pass
+            exits["edge_exit"] = {
+                "triggered": cfg.EDGE_EXIT_ENABLED and _edge_remaining <= _edge_threshold and _edge_hold >= cfg.EDGE_EXIT_MIN_HOLD_SECS,
+                "remaining_edge": round(_edge_remaining, 1),
+                "threshold": round(_edge_threshold, 1),
+                "hold_secs": round(_edge_hold, 0),
+                "min_hold": cfg.EDGE_EXIT_MIN_HOLD_SECS,
+                "enabled": cfg.EDGE_EXIT_ENABLED,
+                "count": edge_exits,
+            }
+        else:
+            exits["stop_loss"] = {"triggered": False, "value": 0, "threshold": cfg.STOP_LOSS_CENTS}
+            exits["hit_and_run"] = {"triggered": False, "value": 0, "threshold": cfg.HIT_RUN_PCT, "enabled": cfg.HIT_RUN_PCT > 0}
+            exits["profit_take"] = {"triggered": False, "value": 0, "threshold": cfg.PROFIT_TAKE_PCT, "min_secs": cfg.PROFIT_TAKE_MIN_SECS}
+            exits["free_roll"] = {"triggered": False, "value": 0, "threshold": cfg.FREE_ROLL_PRICE, "qty": 0, "already_rolled": False}
+            exits["edge_exit"] = {"triggered": False, "remaining_edge": 0, "threshold": 0, "hold_secs": 0, "min_hold": cfg.EDGE_EXIT_MIN_HOLD_SECS, "enabled": cfg.EDGE_EXIT_ENABLED, "count": edge_exits}
+        panels["exits"] = exits
+
+        # Config thresholds for frontend display
+        panels["lead_lag_enabled"] = cfg.LEAD_LAG_ENABLED
+        panels["lead_lag_threshold"] = cfg.LEAD_LAG_THRESHOLD
+        panels["delta_threshold"] = cfg.DELTA_THRESHOLD
+        panels["extreme_delta_threshold"] = cfg.EXTREME_DELTA_THRESHOLD
+        panels["anchor_seconds_threshold"] = cfg.ANCHOR_SECONDS_THRESHOLD
+        panels["min_edge_cents"] = cfg.MIN_EDGE_CENTS
+        panels["min_confidence"] = cfg.RULE_MIN_CONFIDENCE
+        panels["edge_exit_enabled"] = cfg.EDGE_EXIT_ENABLED
+        panels["edge_exit_threshold"] = cfg.EDGE_EXIT_THRESHOLD_CENTS
+        panels["edge_exit_cooldown"] = cfg.EDGE_EXIT_COOLDOWN_SECS
+        panels["reentry_edge_premium"] = cfg.REENTRY_EDGE_PREMIUM
+
+        self.status["dashboard"] = {**dashboard, **panels}
+
+    def _entry_snapshot(self, market_id: str) -> dict | None:
+        """Entry (last BUY) snapshot for a market, from memory when this process made the entry.
+
+        Falls back to the database after a restart and caches what it finds.
+        """
+        entry = self._entry_snaps.get(market_id)
+        if entry is None:
+            entry = get_entry_snapshot(market_id)
+            if entry:
+                self._entry_snaps[market_id] = entry
+        return entry
+
+    def _record_exit_snapshot(
+        self, order: dict, ticker: str, action: str, trigger_type: str, side: str,
+        price_cents: int, quantity: int, position_qty: int, pnl_cents: float, snap_ctx,
+    ):
+        """Record the context snapshot for an exit fill (SL / EDGE / TP / free roll).
+
+        snap_ctx is the cycle's context builder, called only here. The row goes
+        through the write-behind queue, which logs (rather than raises) DB errors.
+        """
+        mid = f"[PAPER] {ticker}" if self.paper_mode else ticker
+        try:
+            entry = self._entry_snapshot(mid)
+        except Exception:  # cold-start DB read; the exit row is still worth writing
+            entry = None
+        if quantity >= position_qty:
+            self._entry_snaps.pop(mid, None)  # full exit: position is gone
+        entry_ts = entry["ts_epoch"] if entry else None
+        now = time.time()
+        try:  # the exit has filled; a context failure must not surface as a cycle error
+            self._queue_write("snapshot", {
+                "ts": datetime.fromtimestamp(now, timezone.utc).isoformat(),
+                "trade_id": order.get("order_id", f"snap-{int(now*1000)}"),
+                "market_id": mid, "action": action, "side": side,
+                "price_cents": price_cents, "quantity": quantity,
+                "decision": action, "confidence": 0, "trigger_type": trigger_type,
+                "position_qty": position_qty,
+                "pnl_cents": pnl_cents,
+                "hold_duration_s": round(now - entry_ts, 1) if entry_ts else None,
+                "entry_price_cents": entry["price_cents"] if entry else None,
+                **snap_ctx(),
+            })
+        except Exception as exc:
+            log_event("ERROR", f"Exit snapshot for {ticker} failed: {exc}")
+
+    def _reset_contract_tracking(self):
+        """Forget per-contract exit/re-entry state when the active contract changes."""
+        self._free_rolled.clear()
+        self._took_profit.clear()
+        self._edge_exit_ts.clear()
+        self._entry_ts.clear()
+        self._entry_edge.clear()
+        self._edge_exits_count.clear()
+
+    async def _fetch_market_and_book(self) -> tuple[dict | None, dict | None]:
+        """Resolve the active market, then its orderbook (one branch of _cycle's gather).
+
+        WS book first, but only while deltas keep arriving: Kalshi sometimes
+        stops sending them, and get_live_orderbook returns None once the book
+        is older than its max_age — then (or if it's empty) fall back to REST.
+        """
+        market = await self.fetch_active_market()
+        if market is None:
+            return None, None
+        ticker = market.get("ticker", "")
+        ob = self.alpha.get_live_orderbook(ticker) if self.alpha else None
+        if not ob or not (ob.get("yes") or ob.get("no")):
+            try:
+                ob = await self.fetch_orderbook(ticker)
+            except Exception:
+                ob = {"yes": [], "no": []}
+        return market, ob
+
     async def _cycle(self):
         self.status["cycle_count"] += 1
+        cfg = config  # bound locally for the threshold reads below (still live — tunable at runtime)
 
         try:
-            # 1. Refresh balance
-            balance = await self.fetch_balance()
+            # 1-4. Balance, positions and market+orderbook are independent reads —
+            # fetch them concurrently so the cycle pays ~one chain of round trips
+            balance, (market, ob), positions = await asyncio.gather(
+                self.fetch_balance(),
+                self._fetch_market_and_book(),
+                self.fetch_positions(),
+            )
             self.status["balance"] = balance
 
-            # 2. Find active market
-            market = await self.fetch_active_market()
             if market is None:
                 self.status["current_market"] = None
                 self.status["last_action"] = "No open market found"
@@ -1017,18 +1525,13 @@ class TradingBot:
                 asyncio.create_task(self._settle_paper_positions(ticker))
                 log_event("INFO", f"Contract transition: {old_ticker} → {ticker} (settlement running in background)")
                 # Clear tracking sets for new contract immediately
-                self._free_rolled.clear()
-                self._took_profit.clear()
-                self._edge_exit_ts.clear()
-                self._entry_ts.clear()
-                self._entry_edge.clear()
-                self._edge_exits_count.clear()
+                self._reset_contract_tracking()
                 if self.alpha:
                     self.alpha.reset_contract_window()
             if self.paper_mode:
                 if self._last_paper_ticker != ticker:
                     self._last_paper_ticker = ticker
-                    self._save_paper_state()
+                    self._schedule_paper_state_save()
                     if self.alpha:
                         self.alpha.reset_contract_window()
             else:
@@ -1036,12 +1539,7 @@ class TradingBot:
                 if self._last_paper_ticker != ticker:
                     old_live_ticker = self._last_paper_ticker
                     self._last_paper_ticker = ticker
-                    self._free_rolled.clear()
-                    self._took_profit.clear()
-                    self._edge_exit_ts.clear()
-                    self._entry_ts.clear()
-                    self._entry_edge.clear()
-                    self._edge_exits_count.clear()
+                    self._reset_contract_tracking()
                     if self.alpha:
                         self.alpha.reset_contract_window()
                     # Record settlement for expired live positions (non-blocking)
@@ -1053,15 +1551,15 @@ class TradingBot:
                 await self.alpha.subscribe_orderbook(ticker)
 
             # 3. Positions + P&L
-            positions = await self.fetch_positions()
-            my_pos = next((p for p in positions if p.get("ticker") == ticker), None)
+            # One pass: this market's position + total cost of all open positions
+            my_pos = None
+            total_exposure_cents = 0
+            for p in positions:
+                if my_pos is None and p.get("ticker") == ticker:
+                    my_pos = p
+                total_exposure_cents += p.get("market_exposure", 0) or 0
             self.status["active_position"] = my_pos
-
-            # Total cost of all open positions (cents → dollars)
-            total_exposure_cents = sum(
-                p.get("market_exposure", 0) or 0 for p in positions
-            )
-            total_exposure = total_exposure_cents / 100.0
+            total_exposure = total_exposure_cents / 100.0  # cents → dollars
 
             # Capture starting snapshot on first cycle
             if self._start_balance is None:
@@ -1077,32 +1575,30 @@ class TradingBot:
             )
             # Daily loss circuit breaker (percentage of starting balance)
             # Uses realized P&L only — unrealized swings shouldn't trigger halt
-            max_daily_loss = self._start_balance * config.MAX_DAILY_LOSS_PCT / 100.0
+            max_daily_loss = self._start_balance * cfg.MAX_DAILY_LOSS_PCT / 100.0
             if settled_pnl < -max_daily_loss:
-                log_event("GUARD", f"Daily loss guard: ${settled_pnl:.2f} exceeds -{config.MAX_DAILY_LOSS_PCT:.1f}% (${max_daily_loss:.2f}) limit")
+                log_event("GUARD", f"Daily loss guard: ${settled_pnl:.2f} exceeds -{cfg.MAX_DAILY_LOSS_PCT:.1f}% (${max_daily_loss:.2f}) limit")
                 self.status["last_action"] = f"Daily loss limit hit (${settled_pnl:.2f})"
                 return
 
-            # 4. Orderbook (always fetch — needed for dashboard + P&L even during guards)
-            # Prefer REST API — WS orderbook often goes stale (Kalshi stops sending deltas)
-            try:
-                ob = await self.fetch_orderbook(ticker)
-            except Exception:
-                live_ob = self.alpha.get_live_orderbook(ticker) if self.alpha else None
-                ob = live_ob if live_ob else {"yes": [], "no": []}
+            # 4. Orderbook (fetched alongside the market above — needed for dashboard
+            # + P&L even during guards)
             if self.paper_mode:
-                self._paper_orderbook = ob
+                self._set_paper_orderbook(ob)
             spread_ok, best_bid, best_ask = self._spread_guard(ob)
+            no_bid = 100 - best_ask   # value of held NO
+            no_ask = 100 - best_bid   # cost to buy NO
+            spread = best_ask - best_bid
 
-            # Store orderbook snapshot for dashboard
-            yes_orders = ob.get("yes", []) if isinstance(ob.get("yes"), list) else []
-            no_orders = ob.get("no", []) if isinstance(ob.get("no"), list) else []
+            # Store orderbook snapshot for dashboard (top_of_book is memoised
+            # on ob, so this reuses the scan _spread_guard just did)
+            _, _, yes_depth, no_depth = top_of_book(ob)
             self.status["orderbook"] = {
                 "best_bid": best_bid,
                 "best_ask": best_ask,
-                "spread": best_ask - best_bid,
-                "yes_depth": sum(q for _, q in yes_orders),
-                "no_depth": sum(q for _, q in no_orders),
+                "spread": spread,
+                "yes_depth": yes_depth,
+                "no_depth": no_depth,
             }
 
             # Unrealized position P&L (mark-to-market vs cost)
@@ -1114,8 +1610,8 @@ class TradingBot:
                     # Long YES: value = best_bid × qty
                     mark_to_market = best_bid * pos_qty
                 elif pos_qty < 0:
-                    # Long NO: value = (100 - best_ask) × |qty|  (what NO side is worth)
-                    mark_to_market = (100 - best_ask) * abs(pos_qty)
+                    # Long NO: value = no_bid × |qty|  (what NO side is worth)
+                    mark_to_market = no_bid * abs(pos_qty)
                 else:
                     mark_to_market = 0
                 self.status["position_pnl"] = (mark_to_market - pos_exposure_cents) / 100.0
@@ -1124,7 +1620,7 @@ class TradingBot:
 
             # All-time P&L: paper uses fixed starting balance, live uses session start
             if self.paper_mode:
-                start_bal = config.PAPER_STARTING_BALANCE
+                start_bal = cfg.PAPER_STARTING_BALANCE
                 all_time_pnl = (balance + total_exposure) - start_bal
             else:
                 start_bal = self._start_balance + self._start_exposure
@@ -1139,19 +1635,25 @@ class TradingBot:
             self.status["total_account_value"] = balance + active_mtm + other_exposure
             self.status["start_balance"] = start_bal
 
-            # ---- Dashboard data (observational — always computed, no impact on trading) ----
+            # ---- Dashboard data ----
+            # Fair value, edges and time factor feed the trade paths below; the
+            # guard/exit panels are observational and published by a task.
             dashboard = {}
             strike = self.status.get("strike_price")
-            has_pos = my_pos is not None and (my_pos.get("position", 0) or 0) != 0
+            pos_val = (my_pos.get("position", 0) or 0) if my_pos else 0
+            time_factor = min(1.0, max(0.0, secs_left / 900.0)) if secs_left else 0.0
+            now_ts = time.monotonic()  # for _entry_ts / _edge_exit_ts ages
 
             # Fair value + edge (requires alpha + strike + time)
+            fv = None
             if self.alpha and strike and strike > 0 and secs_left > 0:
                 try:
                     fv = self.alpha.get_fair_value(strike, secs_left)
                     dashboard["fair_value"] = fv
                     dashboard["yes_edge"] = fv["fair_yes_cents"] - best_ask
-                    dashboard["no_edge"] = (100 - fv["fair_yes_cents"]) - (100 - best_bid)
+                    dashboard["no_edge"] = (100 - fv["fair_yes_cents"]) - no_ask
                 except Exception:
+                    fv = None
                     dashboard["fair_value"] = None
                     dashboard["yes_edge"] = 0
                     dashboard["no_edge"] = 0
@@ -1161,175 +1663,39 @@ class TradingBot:
                 dashboard["no_edge"] = 0
 
             # Time decay factor
-            dashboard["time_factor"] = min(1.0, max(0.0, secs_left / 900.0)) if secs_left else 0.0
-
-            # Guard states
-            spread_val = best_ask - best_bid
-            max_exposure = balance * config.MAX_TOTAL_EXPOSURE_PCT / 100.0
-            price_est = best_ask if best_ask < 100 else 50
-            position_budget = balance * config.MAX_POSITION_PCT / 100.0
-            max_qty = max(1, int(position_budget / (price_est / 100.0))) if price_est > 0 else 1
-            current_qty = abs(my_pos.get("position", 0) or 0) if my_pos else 0
-            pos_val = (my_pos.get("position", 0) or 0) if my_pos else 0
-
-            dashboard["guards"] = {
-                "time": {
-                    "blocked": secs_left < config.MIN_SECONDS_TO_CLOSE if secs_left else True,
-                    "value": round(secs_left or 0, 0),
-                    "threshold": config.MIN_SECONDS_TO_CLOSE,
-                },
-                "spread": {
-                    "blocked": spread_val > config.MAX_SPREAD_CENTS,
-                    "value": spread_val,
-                    "threshold": config.MAX_SPREAD_CENTS,
-                },
-                "daily_loss": {
-                    "blocked": settled_pnl < -max_daily_loss,
-                    "value": round(settled_pnl, 2),
-                    "threshold": round(-max_daily_loss, 2),
-                },
-                "hold_expiry": {
-                    "blocked": secs_left < config.HOLD_EXPIRY_SECS if secs_left else False,
-                    "value": round(secs_left or 0, 0),
-                    "threshold": config.HOLD_EXPIRY_SECS,
-                    "has_position": has_pos,
-                },
-                "price_min": {
-                    "blocked": best_ask < config.MIN_CONTRACT_PRICE and (100 - best_bid) < config.MIN_CONTRACT_PRICE,
-                    "value_yes": best_ask,
-                    "value_no": 100 - best_bid,
-                    "threshold": config.MIN_CONTRACT_PRICE,
-                },
-                "price_max": {
-                    "blocked": best_ask > config.MAX_CONTRACT_PRICE and (100 - best_bid) > config.MAX_CONTRACT_PRICE,
-                    "value_yes": best_ask,
-                    "value_no": 100 - best_bid,
-                    "threshold": config.MAX_CONTRACT_PRICE,
-                },
-                "exposure": {
-                    "blocked": total_exposure >= max_exposure,
-                    "value": round(total_exposure, 2),
-                    "threshold": round(max_exposure, 2),
-                },
-                "position_size": {
-                    "blocked": current_qty >= max_qty,
-                    "value": current_qty,
-                    "threshold": max_qty,
-                },
-                "same_side": {
-                    "blocked": False,
-                    "holding": "YES" if pos_val > 0 else ("NO" if pos_val < 0 else "NONE"),
-                },
-                "tp_reentry": {
-                    "blocked": ticker in self._took_profit if ticker else False,
-                },
-                "edge_reentry": {
-                    "blocked": ticker in self._edge_exit_ts and (time.time() - self._edge_exit_ts.get(ticker, 0)) < config.EDGE_EXIT_COOLDOWN_SECS if ticker else False,
-                    "cooldown_left": max(0, config.EDGE_EXIT_COOLDOWN_SECS - (time.time() - self._edge_exit_ts.get(ticker, 0))) if ticker and ticker in self._edge_exit_ts else 0,
-                    "premium": config.REENTRY_EDGE_PREMIUM,
-                },
-            }
-
-            # Exit rule states
-            exits = {}
-            if has_pos:
-                eq = abs(pos_val)
-                pe = (my_pos.get("market_exposure", 0) or 0)
-                sp = best_bid if pos_val > 0 else (100 - best_ask)
-                mtm_e = best_bid * pos_val if pos_val > 0 else (100 - best_ask) * eq if pos_val < 0 else 0
-                avg_c = pe / eq if eq > 0 else 0
-                loss_p = (pe - mtm_e) / eq if eq > 0 else 0
-                gain_p = ((sp - avg_c) / avg_c * 100) if avg_c > 0 else 0
-
-                exits["stop_loss"] = {
-                    "triggered": config.STOP_LOSS_CENTS > 0 and loss_p >= config.STOP_LOSS_CENTS,
-                    "value": round(loss_p, 1),
-                    "threshold": config.STOP_LOSS_CENTS,
-                }
-                exits["hit_and_run"] = {
-                    "triggered": config.HIT_RUN_PCT > 0 and gain_p >= config.HIT_RUN_PCT,
-                    "value": round(gain_p, 1),
-                    "threshold": config.HIT_RUN_PCT,
-                    "enabled": config.HIT_RUN_PCT > 0,
-                }
-                exits["profit_take"] = {
-                    "triggered": gain_p >= config.PROFIT_TAKE_PCT and secs_left > config.PROFIT_TAKE_MIN_SECS,
-                    "value": round(gain_p, 1),
-                    "threshold": config.PROFIT_TAKE_PCT,
-                    "min_secs": config.PROFIT_TAKE_MIN_SECS,
-                }
-                exits["free_roll"] = {
-                    "triggered": sp >= config.FREE_ROLL_PRICE and eq >= 2 and ticker not in self._free_rolled,
-                    "value": sp,
-                    "threshold": config.FREE_ROLL_PRICE,
-                    "qty": eq,
-                    "already_rolled": ticker in self._free_rolled,
-                }
+            dashboard["time_factor"] = time_factor
+
+            # Guard/exit panels are display-only and cheap (dict building, no I/O)
+            self._publish_dashboard(
+                dashboard, ticker=ticker, balance=balance, best_bid=best_bid, best_ask=best_ask,
+                secs_left=secs_left, settled_pnl=settled_pnl, max_daily_loss=max_daily_loss,
+                total_exposure=total_exposure, pos_val=pos_val,
+                pos_exposure=(my_pos.get("market_exposure", 0) or 0) if my_pos else 0,
+                mark_to_market=mark_to_market if my_pos else 0, strike=strike, fv=fv, now_ts=now_ts,
+                took_profit=ticker in self._took_profit if ticker else False,
+                free_rolled=ticker in self._free_rolled,
+                edge_exit_age=now_ts - self._edge_exit_ts[ticker] if ticker in self._edge_exit_ts else None,
+                entry_ts=self._entry_ts.get(ticker),
+                edge_exits=self._edge_exits_count.get(ticker, 0) if ticker else 0,
+            )
 
-                # Edge-exit dashboard data
-                _edge_remaining = 0
-                _edge_threshold = 0
-                _edge_hold = time.time() - self._entry_ts.get(ticker, time.time())
-                if config.EDGE_EXIT_ENABLED and self.alpha and strike and strike > 0:
-                    try:
-                        _fv_edge = self.alpha.get_fair_value(strike, secs_left)
-                        _fair_yes_edge = _fv_edge.get("fair_yes_cents", 0)
-                        if pos_val > 0:
-                            _edge_remaining = _fair_yes_edge - best_bid
-                        else:
-                            _edge_remaining = best_ask - _fair_yes_edge
-                        _tf = min(1.0, max(0.0, secs_left / 900.0))
-                        _edge_threshold = config.EDGE_EXIT_THRESHOLD_CENTS * _tf
-                    except Exception:
-                        pass
-                exits["edge_exit"] = {
-                    "triggered": config.EDGE_EXIT_ENABLED and _edge_remaining <= _edge_threshold and _edge_hold >= config.EDGE_EXIT_MIN_HOLD_SECS,
-                    "remaining_edge": round(_edge_remaining, 1),
-                    "threshold": round(_edge_threshold, 1),
-                    "hold_secs": round(_edge_hold, 0),
-                    "min_hold": config.EDGE_EXIT_MIN_HOLD_SECS,
-                    "enabled": config.EDGE_EXIT_ENABLED,
-                    "count": self._edge_exits_count.get(ticker, 0),
-                }
-            else:
-                exits["stop_loss"] = {"triggered": False, "value": 0, "threshold": config.STOP_LOSS_CENTS}
-                exits["hit_and_run"] = {"triggered": False, "value": 0, "threshold": config.HIT_RUN_PCT, "enabled": config.HIT_RUN_PCT > 0}
-                exits["profit_take"] = {"triggered": False, "value": 0, "threshold": config.PROFIT_TAKE_PCT, "min_secs": config.PROFIT_TAKE_MIN_SECS}
-                exits["free_roll"] = {"triggered": False, "value": 0, "threshold": config.FREE_ROLL_PRICE, "qty": 0, "already_rolled": False}
-                exits["edge_exit"] = {"triggered": False, "remaining_edge": 0, "threshold": 0, "hold_secs": 0, "min_hold": config.EDGE_EXIT_MIN_HOLD_SECS, "enabled": config.EDGE_EXIT_ENABLED, "count": self._edge_exits_count.get(ticker, 0) if ticker else 0}
-            dashboard["exits"] = exits
-
-            # Config thresholds for frontend display
-            dashboard["lead_lag_enabled"] = config.LEAD_LAG_ENABLED
-            dashboard["lead_lag_threshold"] = config.LEAD_LAG_THRESHOLD
-            dashboard["delta_threshold"] = config.DELTA_THRESHOLD
-            dashboard["extreme_delta_threshold"] = config.EXTREME_DELTA_THRESHOLD
-            dashboard["anchor_seconds_threshold"] = config.ANCHOR_SECONDS_THRESHOLD
-            dashboard["min_edge_cents"] = config.MIN_EDGE_CENTS
-            dashboard["min_confidence"] = config.RULE_MIN_CONFIDENCE
-            dashboard["edge_exit_enabled"] = config.EDGE_EXIT_ENABLED
-            dashboard["edge_exit_threshold"] = config.EDGE_EXIT_THRESHOLD_CENTS
-            dashboard["edge_exit_cooldown"] = config.EDGE_EXIT_COOLDOWN_SECS
-            dashboard["reentry_edge_premium"] = config.REENTRY_EDGE_PREMIUM
-
-            self.status["dashboard"] = dashboard
-
-            # Build snapshot context dict for trade recording (used by all trade paths below)
-            _snap_ctx = {}
-            if self.alpha:
-                _gwp = self.alpha.get_weighted_global_price()
+            # Snapshot context for trade recording — only built when an order
+            # actually goes out, not on every Holding / guard tick
+            def _snap_ctx() -> dict:
+                if not self.alpha:
+                    return {}
                 _vol = self.alpha.get_volatility()
                 _vel = self.alpha.get_price_velocity()
                 _fv_data = dashboard.get("fair_value") or {}
-                _snap_ctx = {
-                    "btc_price": _gwp,
+                return {
+                    "btc_price": self.alpha.get_weighted_global_price(),
                     "strike_price": strike,
                     "btc_vs_strike": _fv_data.get("btc_vs_strike", 0),
                     "secs_left": secs_left,
                     "time_factor": dashboard.get("time_factor", 0),
                     "best_bid": best_bid,
                     "best_ask": best_ask,
-                    "spread": best_ask - best_bid,
+                    "spread": spread,
                     "fair_yes_cents": _fv_data.get("fair_yes_cents", 0),
                     "fair_yes_prob": _fv_data.get("fair_yes_prob", 0),
                     "yes_edge": dashboard.get("yes_edge", 0),
@@ -1346,100 +1712,74 @@ class TradingBot:
 
             # 5. Exit logic (stop-loss + profit-taking) — before time guard
             #    so hold-to-expiry can still fire, but after P&L is computed
-            if my_pos:
-                pos_qty = my_pos.get("position", 0) or 0
-                pos_exposure_cents = my_pos.get("market_exposure", 0) or 0
-                mark_to_market_exit = best_bid * pos_qty if pos_qty > 0 else (100 - best_ask) * abs(pos_qty) if pos_qty < 0 else 0
+            #    (a flat position record skips it; pos_qty / pos_exposure_cents /
+            #    mark_to_market come from the P&L step above)
+            if pos_val:
+                abs_qty = abs(pos_qty)
+                avg_cost = pos_exposure_cents / abs_qty
 
-                if abs(pos_qty) > 0 and config.TRADING_ENABLED:
+                if cfg.TRADING_ENABLED:
                     sell_side = "yes" if pos_qty > 0 else "no"
-                    sell_price = best_bid if pos_qty > 0 else (100 - best_ask)
-                    sell_price = max(1, min(99, sell_price))
+                    sell_price = best_bid if pos_qty > 0 else no_bid
+                    sell_price = 1 if sell_price < 1 else 99 if sell_price > 99 else sell_price
                     current_value = sell_price
 
                     # Rule: Last-Minute Hold — don't sell in final stretch, ride to settlement
-                    if secs_left < config.HOLD_EXPIRY_SECS:
+                    if secs_left < cfg.HOLD_EXPIRY_SECS:
                         log_event("GUARD", f"Hold-to-expiry: {secs_left:.0f}s left — riding to settlement")
                         self.status["last_action"] = f"Holding to expiry ({secs_left:.0f}s left)"
                         return
 
                     # Rule: Stop-loss (still active outside hold zone)
-                    if config.STOP_LOSS_CENTS > 0:
-                        loss_per_contract = (pos_exposure_cents - mark_to_market_exit) / abs(pos_qty)
-                        if loss_per_contract >= config.STOP_LOSS_CENTS:
-                            sell_qty = abs(pos_qty)
-                            log_event("GUARD", f"Stop-loss triggered: down {loss_per_contract:.0f}c/contract (limit {config.STOP_LOSS_CENTS}c)")
+                    if cfg.STOP_LOSS_CENTS > 0:
+                        loss_per_contract = (pos_exposure_cents - mark_to_market) / abs_qty
+                        if loss_per_contract >= cfg.STOP_LOSS_CENTS:
+                            sell_qty = abs_qty
+                            log_event("GUARD", f"Stop-loss triggered: down {loss_per_contract:.0f}c/contract (limit {cfg.STOP_LOSS_CENTS}c)")
                             order = await self.close_position(ticker, sell_side, sell_price, sell_qty, exit_type="SL")
                             if order:
                                 self.status["last_action"] = f"SL: sold {sell_qty}x {sell_side.upper()} @ {sell_price}c"
-                                try:
-                                    _mid = f"[PAPER] {ticker}" if self.paper_mode else ticker
-                                    _entry = get_entry_snapshot(_mid)
-                                    _entry_ts = datetime.fromisoformat(_entry["ts"]).timestamp() if _entry else None
-                                    record_snapshot({
-                                        "ts": datetime.now(timezone.utc).isoformat(),
-                                        "trade_id": order.get("order_id", f"snap-{int(time.time()*1000)}"),
-                                        "market_id": _mid, "action": "SL", "side": sell_side,
-                                        "price_cents": sell_price, "quantity": sell_qty,
-                                        "decision": "SL", "confidence": 0, "trigger_type": "stop_loss",
-                                        "position_qty": abs(pos_qty),
-                                        "pnl_cents": round(-loss_per_contract * sell_qty, 1),
-                                        "hold_duration_s": round(time.time() - _entry_ts, 1) if _entry_ts else None,
-                                        "entry_price_cents": _entry["price_cents"] if _entry else None,
-                                        **_snap_ctx,
-                                    })
-                                except Exception:
-                                    pass
+                                self._record_exit_snapshot(
+                                    order, ticker, "SL", "stop_loss", sell_side, sell_price, sell_qty,
+                                    abs_qty, round(-loss_per_contract * sell_qty, 1), _snap_ctx,
+                                )
                             else:
                                 self.status["last_action"] = "SL: sell order rejected"
                             return
 
                     # Rule: Edge-exit — exit when remaining edge evaporates (time-scaled)
-                    if config.EDGE_EXIT_ENABLED and self.alpha and strike and strike > 0:
+                    # (fv / time_factor are this cycle's, computed above with the same inputs)
+                    if cfg.EDGE_EXIT_ENABLED and fv is not None:
                         try:
-                            fv = self.alpha.get_fair_value(strike, secs_left)
                             fair_yes = fv.get("fair_yes_cents", 0)
                             if pos_qty > 0:
                                 remaining_edge = fair_yes - best_bid
                             else:
                                 remaining_edge = best_ask - fair_yes
 
-                            time_factor = min(1.0, max(0.0, secs_left / 900.0))
-                            edge_threshold = config.EDGE_EXIT_THRESHOLD_CENTS * time_factor
-                            hold_elapsed = time.time() - self._entry_ts.get(ticker, 0)
+                            edge_threshold = cfg.EDGE_EXIT_THRESHOLD_CENTS * time_factor
+                            # Untracked entry (e.g. position predates a restart) counts as held long enough
+                            _entered = self._entry_ts.get(ticker)
+                            hold_elapsed = now_ts - _entered if _entered is not None else float("inf")
 
                             if (remaining_edge <= edge_threshold
-                                    and hold_elapsed >= config.EDGE_EXIT_MIN_HOLD_SECS):
-                                sell_qty = abs(pos_qty)
+                                    and hold_elapsed >= cfg.EDGE_EXIT_MIN_HOLD_SECS):
+                                sell_qty = abs_qty
                                 log_event("TRADE", f"Edge-exit: remaining edge {remaining_edge:.1f}c <= threshold {edge_threshold:.1f}c (held {hold_elapsed:.0f}s)")
                                 order = await self.close_position(ticker, sell_side, sell_price, sell_qty, exit_type="EDGE")
                                 if order:
                                     self.status["last_action"] = f"EDGE EXIT: sold {sell_qty}x {sell_side.upper()} @ {sell_price}c (edge {remaining_edge:.1f}c)"
-                                    self._edge_exit_ts[ticker] = time.time()
+                                    self._edge_exit_ts[ticker] = time.monotonic()
                                     self._edge_exits_count[ticker] = self._edge_exits_count.get(ticker, 0) + 1
                                     # Clear entry tracking (position is closed)
                                     self._entry_ts.pop(ticker, None)
                                     self._entry_edge.pop(ticker, None)
-                                    try:
-                                        _mid = f"[PAPER] {ticker}" if self.paper_mode else ticker
-                                        _entry = get_entry_snapshot(_mid)
-                                        _entry_ts_snap = datetime.fromisoformat(_entry["ts"]).timestamp() if _entry else None
-                                        avg_cost_edge = pos_exposure_cents / abs(pos_qty) if abs(pos_qty) > 0 else 0
-                                        _pnl = round((sell_price - avg_cost_edge) * sell_qty, 1) if avg_cost_edge else 0
-                                        record_snapshot({
-                                            "ts": datetime.now(timezone.utc).isoformat(),
-                                            "trade_id": order.get("order_id", f"snap-{int(time.time()*1000)}"),
-                                            "market_id": _mid, "action": "EDGE", "side": sell_side,
-                                            "price_cents": sell_price, "quantity": sell_qty,
-                                            "decision": "EDGE", "confidence": 0, "trigger_type": "edge_exit",
-                                            "position_qty": abs(pos_qty),
-                                            "pnl_cents": _pnl,
-                                            "hold_duration_s": round(time.time() - _entry_ts_snap, 1) if _entry_ts_snap else None,
-                                            "entry_price_cents": _entry["price_cents"] if _entry else None,
-                                            **_snap_ctx,
-                                        })
-                                    except Exception:
-                                        pass
+                                    self._record_exit_snapshot(
+                                        order, ticker, "EDGE", "edge_exit", sell_side, sell_price, sell_qty,
+                                        abs_qty,
+                                        round((sell_price - avg_cost) * sell_qty, 1) if avg_cost else 0,
+                                        _snap_ctx,
+                                    )
                                 else:
                                     self.status["last_action"] = "Edge exit: sell order rejected"
                                 return
@@ -1447,100 +1787,57 @@ class TradingBot:
                             pass  # Fair value unavailable — skip edge-exit
 
                     # Calculate profit for all profit-taking rules
-                    avg_cost = pos_exposure_cents / abs(pos_qty) if abs(pos_qty) > 0 else 0
                     gain_pct = ((current_value - avg_cost) / avg_cost * 100) if avg_cost > 0 else 0
 
                     # Rule: Hit-and-Run — instant exit at % profit (NO time restrictions)
-                    if config.HIT_RUN_PCT > 0 and gain_pct >= config.HIT_RUN_PCT:
-                        sell_qty = abs(pos_qty)
-                        log_event("TRADE", f"Hit-and-run: +{gain_pct:.0f}% gain ({current_value}c vs {avg_cost:.0f}c cost) >= {config.HIT_RUN_PCT}% target — instant exit")
+                    if cfg.HIT_RUN_PCT > 0 and gain_pct >= cfg.HIT_RUN_PCT:
+                        sell_qty = abs_qty
+                        log_event("TRADE", f"Hit-and-run: +{gain_pct:.0f}% gain ({current_value}c vs {avg_cost:.0f}c cost) >= {cfg.HIT_RUN_PCT}% target — instant exit")
                         order = await self.close_position(ticker, sell_side, sell_price, sell_qty, exit_type="TP")
                         if order:
                             self.status["last_action"] = f"HIT&RUN: sold {sell_qty}x {sell_side.upper()} @ {sell_price}c (+{gain_pct:.0f}%)"
                             self._took_profit.add(ticker)
-                            try:
-                                _mid = f"[PAPER] {ticker}" if self.paper_mode else ticker
-                                _entry = get_entry_snapshot(_mid)
-                                _entry_ts = datetime.fromisoformat(_entry["ts"]).timestamp() if _entry else None
-                                _pnl = round((sell_price - avg_cost) * sell_qty, 1) if avg_cost else 0
-                                record_snapshot({
-                                    "ts": datetime.now(timezone.utc).isoformat(),
-                                    "trade_id": order.get("order_id", f"snap-{int(time.time()*1000)}"),
-                                    "market_id": _mid, "action": "TP", "side": sell_side,
-                                    "price_cents": sell_price, "quantity": sell_qty,
-                                    "decision": "TP", "confidence": 0, "trigger_type": "hit_and_run",
-                                    "position_qty": abs(pos_qty),
-                                    "pnl_cents": _pnl,
-                                    "hold_duration_s": round(time.time() - _entry_ts, 1) if _entry_ts else None,
-                                    "entry_price_cents": _entry["price_cents"] if _entry else None,
-                                    **_snap_ctx,
-                                })
-                            except Exception:
-                                pass
+                            self._record_exit_snapshot(
+                                order, ticker, "TP", "hit_and_run", sell_side, sell_price, sell_qty,
+                                abs_qty, round((sell_price - avg_cost) * sell_qty, 1) if avg_cost else 0,
+                                _snap_ctx,
+                            )
                         else:
                             self.status["last_action"] = "Hit&Run: sell order rejected"
                         return
 
                     # Rule: Pop-and-Drop — full exit at % profit with time remaining
-                    if gain_pct >= config.PROFIT_TAKE_PCT and secs_left > config.PROFIT_TAKE_MIN_SECS:
-                        sell_qty = abs(pos_qty)
-                        log_event("TRADE", f"Profit take: +{gain_pct:.0f}% gain ({current_value}c vs {avg_cost:.0f}c cost) >= {config.PROFIT_TAKE_PCT}% target, {secs_left:.0f}s left — selling all")
+                    if gain_pct >= cfg.PROFIT_TAKE_PCT and secs_left > cfg.PROFIT_TAKE_MIN_SECS:
+                        sell_qty = abs_qty
+                        log_event("TRADE", f"Profit take: +{gain_pct:.0f}% gain ({current_value}c vs {avg_cost:.0f}c cost) >= {cfg.PROFIT_TAKE_PCT}% target, {secs_left:.0f}s left — selling all")
                         order = await self.close_position(ticker, sell_side, sell_price, sell_qty, exit_type="TP")
                         if order:
                             self.status["last_action"] = f"TP: sold {sell_qty}x {sell_side.upper()} @ {sell_price}c (+{gain_pct:.0f}%)"
                             self._took_profit.add(ticker)
-                            try:
-                                _mid = f"[PAPER] {ticker}" if self.paper_mode else ticker
-                                _entry = get_entry_snapshot(_mid)
-                                _entry_ts = datetime.fromisoformat(_entry["ts"]).timestamp() if _entry else None
-                                _pnl = round((sell_price - avg_cost) * sell_qty, 1) if avg_cost else 0
-                                record_snapshot({
-                                    "ts": datetime.now(timezone.utc).isoformat(),
-                                    "trade_id": order.get("order_id", f"snap-{int(time.time()*1000)}"),
-                                    "market_id": _mid, "action": "TP", "side": sell_side,
-                                    "price_cents": sell_price, "quantity": sell_qty,
-                                    "decision": "TP", "confidence": 0, "trigger_type": "profit_take",
-                                    "position_qty": abs(pos_qty),
-                                    "pnl_cents": _pnl,
-                                    "hold_duration_s": round(time.time() - _entry_ts, 1) if _entry_ts else None,
-                                    "entry_price_cents": _entry["price_cents"] if _entry else None,
-                                    **_snap_ctx,
-                                })
-                            except Exception:
-                                pass
+                            self._record_exit_snapshot(
+                                order, ticker, "TP", "profit_take", sell_side, sell_price, sell_qty,
+                                abs_qty, round((sell_price - avg_cost) * sell_qty, 1) if avg_cost else 0,
+                                _snap_ctx,
+                            )
                         else:
                             self.status["last_action"] = "TP: sell order rejected"
                         return
 
                     # Rule: Free Roll — sell half at intermediate profit to lock in capital
-                    if (current_value >= config.FREE_ROLL_PRICE
+                    if (current_value >= cfg.FREE_ROLL_PRICE
                             and ticker not in self._free_rolled
-                            and abs(pos_qty) >= 2):
-                        half_qty = max(1, abs(pos_qty) // 2)
-                        log_event("TRADE", f"Free roll: {current_value}c >= {config.FREE_ROLL_PRICE}c — selling {half_qty}/{abs(pos_qty)} to lock in capital")
+                            and abs_qty >= 2):
+                        half_qty = max(1, abs_qty // 2)
+                        log_event("TRADE", f"Free roll: {current_value}c >= {cfg.FREE_ROLL_PRICE}c — selling {half_qty}/{abs_qty} to lock in capital")
                         order = await self.close_position(ticker, sell_side, sell_price, half_qty)
                         if order:
                             self._free_rolled.add(ticker)
                             self.status["last_action"] = f"Free roll: sold {half_qty}x {sell_side.upper()} @ {sell_price}c"
-                            try:
-                                _mid = f"[PAPER] {ticker}" if self.paper_mode else ticker
-                                _entry = get_entry_snapshot(_mid)
-                                _entry_ts = datetime.fromisoformat(_entry["ts"]).timestamp() if _entry else None
-                                _pnl = round((sell_price - avg_cost) * half_qty, 1) if avg_cost else 0
-                                record_snapshot({
-                                    "ts": datetime.now(timezone.utc).isoformat(),
-                                    "trade_id": order.get("order_id", f"snap-{int(time.time()*1000)}"),
-                                    "market_id": _mid, "action": "SELL", "side": sell_side,
-                                    "price_cents": sell_price, "quantity": half_qty,
-                                    "decision": "SELL", "confidence": 0, "trigger_type": "free_roll",
-                                    "position_qty": abs(pos_qty),
-                                    "pnl_cents": _pnl,
-                                    "hold_duration_s": round(time.time() - _entry_ts, 1) if _entry_ts else None,
-                                    "entry_price_cents": _entry["price_cents"] if _entry else None,
-                                    **_snap_ctx,
-                                })
-                            except Exception:
-                                pass
+                            self._record_exit_snapshot(
+                                order, ticker, "SELL", "free_roll", sell_side, sell_price, half_qty,
+                                abs_qty, round((sell_price - avg_cost) * half_qty, 1) if avg_cost else 0,
+                                _snap_ctx,
+                            )
                         else:
                             self.status["last_action"] = "Free roll: sell order rejected"
                         return
@@ -1564,12 +1861,12 @@ class TradingBot:
                 "seconds_to_close": market.get("_seconds_to_close", 0),
                 "best_bid": best_bid,
                 "best_ask": best_ask,
-                "spread": best_ask - best_bid,
+                "spread": spread,
                 "last_price": live_tkr.get("yes_bid", market.get("last_price", 0)) if live_tkr else market.get("last_price", 0),
                 "volume": live_tkr.get("volume", market.get("volume", 0)) if live_tkr else market.get("volume", 0),
                 "strike_price": self.status.get("strike_price", 0),
             }
-            # Enrich agent context with multi-exchange data
+            # Enrich agent context with multi-exchange data (gwp is reused by the overrides)
             if self.alpha:
                 gwp = self.alpha.get_weighted_global_price()
                 if gwp > 0:
@@ -1582,73 +1879,71 @@ class TradingBot:
                         market_data["settlement_price"] = round(settle_p, 2)
 
             # ── ALPHA ENGINE OVERRIDES ──────────────────────────────
+            yes_edge = dashboard.get("yes_edge", 0)
+            no_edge = dashboard.get("no_edge", 0)
+            min_edge = cfg.MIN_EDGE_CENTS
             alpha_override = None
             _trigger_type = "rules"
             if self.alpha and self.alpha.binance_connected and self.alpha.coinbase_connected:
-                momentum = self.alpha.delta_momentum
+                alpha = self.alpha
+                momentum = alpha.delta_momentum
                 secs_left = market.get("_seconds_to_close", 0)
-                self.status["alpha_latency_delta"] = self.alpha.latency_delta
+                self.status["alpha_latency_delta"] = alpha.latency_delta
                 self.status["alpha_delta_momentum"] = momentum
-                self.status["alpha_delta_baseline"] = self.alpha.delta_baseline
-                self.status["alpha_projected_settlement"] = self.alpha.projected_settlement
+                self.status["alpha_delta_baseline"] = alpha.delta_baseline
+                self.status["alpha_projected_settlement"] = alpha.projected_settlement
                 self.status["alpha_binance_connected"] = True
                 self.status["alpha_coinbase_connected"] = True
-                self.status["alpha_weighted_price"] = self.alpha.get_weighted_global_price()
-                self.status["alpha_lead_lag_spread"] = self.alpha.lead_lag_spread
+                self.status["alpha_weighted_price"] = gwp
+                self.status["alpha_lead_lag_spread"] = alpha.lead_lag_spread
 
                 # Override 0: Lead-Lag Signal (weighted global price vs strike)
                 # Uses all 6 exchanges to detect when BTC has moved but Kalshi
                 # contracts haven't repriced yet (the "60-second lag" play).
                 # Only overrides if actual edge exists (Kalshi hasn't caught up).
-                strike = self._extract_strike(market)
-                if config.LEAD_LAG_ENABLED and strike and strike > 0:
-                    signal, diff = self.alpha.get_signal(strike)
+                strike = self.status.get("strike_price")  # extracted once at cycle start
+                if cfg.LEAD_LAG_ENABLED and strike and strike > 0:
+                    signal, diff = alpha.get_signal(strike)
                     self.status["alpha_signal"] = signal
                     self.status["alpha_signal_diff"] = diff
-                    yes_edge = dashboard.get("yes_edge", 0)
-                    no_edge = dashboard.get("no_edge", 0)
-                    min_edge = config.MIN_EDGE_CENTS
                     if signal == "BULLISH" and yes_edge >= min_edge:
                         alpha_override = "BUY_YES"
                         _trigger_type = "lead_lag"
-                        log_event("ALPHA", f"Lead-lag BUY_YES: global ${self.alpha.get_weighted_global_price():.2f} > strike ${strike:.2f} by ${diff:.2f} (edge {yes_edge}c)")
+                        log_event("ALPHA", f"Lead-lag BUY_YES: global ${gwp:.2f} > strike ${strike:.2f} by ${diff:.2f} (edge {yes_edge}c)")
                     elif signal == "BEARISH" and no_edge >= min_edge:
                         alpha_override = "BUY_NO"
                         _trigger_type = "lead_lag"
-                        log_event("ALPHA", f"Lead-lag BUY_NO: global ${self.alpha.get_weighted_global_price():.2f} < strike ${strike:.2f} by ${abs(diff):.2f} (edge {no_edge}c)")
+                        log_event("ALPHA", f"Lead-lag BUY_NO: global ${gwp:.2f} < strike ${strike:.2f} by ${abs(diff):.2f} (edge {no_edge}c)")
                     elif signal != "NEUTRAL":
                         log_event("ALPHA", f"Lead-lag {signal} but no edge (YES:{yes_edge}c NO:{no_edge}c < {min_edge}c) — deferring to rules")
 
                 # Override 1: Front-Run (delta momentum — deviation from rolling baseline)
                 # Only fires if lead-lag didn't already trigger, and only with edge
                 if not alpha_override:
-                    yes_edge = dashboard.get("yes_edge", 0)
-                    no_edge = dashboard.get("no_edge", 0)
-                    min_edge = config.MIN_EDGE_CENTS
-                    if momentum > config.DELTA_THRESHOLD and yes_edge >= min_edge:
+                    if momentum > cfg.DELTA_THRESHOLD and yes_edge >= min_edge:
                         alpha_override = "BUY_YES"
                         _trigger_type = "momentum"
-                        log_event("ALPHA", f"Front-run BUY_YES: momentum={momentum:+.2f} > {config.DELTA_THRESHOLD} (edge {yes_edge}c)")
-                    elif momentum < -config.DELTA_THRESHOLD and no_edge >= min_edge:
+                        log_event("ALPHA", f"Front-run BUY_YES: momentum={momentum:+.2f} > {cfg.DELTA_THRESHOLD} (edge {yes_edge}c)")
+                    elif momentum < -cfg.DELTA_THRESHOLD and no_edge >= min_edge:
                         alpha_override = "BUY_NO"
                         _trigger_type = "momentum"
-                        log_event("ALPHA", f"Front-run BUY_NO: momentum={momentum:+.2f} < -{config.DELTA_THRESHOLD} (edge {no_edge}c)")
+                        log_event("ALPHA", f"Front-run BUY_NO: momentum={momentum:+.2f} < -{cfg.DELTA_THRESHOLD} (edge {no_edge}c)")
 
                 # Override 2: Anchor Defense (near expiry + holding position)
-                if secs_left < config.ANCHOR_SECONDS_THRESHOLD and my_pos:
+                if secs_left < cfg.ANCHOR_SECONDS_THRESHOLD and my_pos:
                     if strike and strike > 0:
-                        projection_wins = self.alpha.get_settlement_projection(strike, secs_left)
+                        projection_wins = alpha.get_settlement_projection(strike, secs_left)
                         pos_val = my_pos.get("position", 0) or 0
                         yes_qty = pos_val if pos_val > 0 else 0
                         no_qty = abs(pos_val) if pos_val < 0 else 0
                         if yes_qty and not projection_wins:
                             alpha_override = "BUY_NO"
                             _trigger_type = "anchor"
-                            log_event("ALPHA", f"Anchor defense: proj {self.alpha.projected_settlement:.2f} < strike {strike}, forcing BUY_NO")
+                            log_event("ALPHA", f"Anchor defense: proj {alpha.projected_settlement:.2f} < strike {strike}, forcing BUY_NO")
                         elif no_qty and projection_wins:
                             alpha_override = "BUY_YES"
                             _trigger_type = "anchor"
-                            log_event("ALPHA", f"Anchor defense: proj {self.alpha.projected_settlement:.2f} >= strike {strike}, forcing BUY_YES")
+                            log_event("ALPHA", f"Anchor defense: proj {alpha.projected_settlement:.2f} >= strike {strike}, forcing BUY_YES")
             else:
                 # Update connection status even when disconnected
                 if self.alpha:
@@ -1657,7 +1952,7 @@ class TradingBot:
 
             self.status["alpha_override"] = alpha_override
 
-            if not config.TRADING_ENABLED:
+            if not cfg.TRADING_ENABLED:
                 self.status["last_action"] = "Trading disabled — dry run"
                 if alpha_override:
                     decision = {"decision": alpha_override, "confidence": 1.0,
@@ -1685,7 +1980,7 @@ class TradingBot:
                 action = decision["decision"]
                 confidence = decision["confidence"]
 
-                if action == "HOLD" or confidence < config.RULE_MIN_CONFIDENCE:
+                if action == "HOLD" or confidence < cfg.RULE_MIN_CONFIDENCE:
                     self.status["last_action"] = f"Rules: {action} ({confidence:.0%})"
                     return
 
@@ -1713,17 +2008,17 @@ class TradingBot:
 
             # Edge-exit re-entry guard: cooldown + premium edge required
             if ticker in self._edge_exit_ts:
-                cooldown_elapsed = time.time() - self._edge_exit_ts[ticker]
-                if cooldown_elapsed < config.EDGE_EXIT_COOLDOWN_SECS:
-                    remaining_cd = config.EDGE_EXIT_COOLDOWN_SECS - cooldown_elapsed
+                cooldown_elapsed = now_ts - self._edge_exit_ts[ticker]
+                if cooldown_elapsed < cfg.EDGE_EXIT_COOLDOWN_SECS:
+                    remaining_cd = cfg.EDGE_EXIT_COOLDOWN_SECS - cooldown_elapsed
                     log_event("GUARD", f"Edge re-entry cooldown: {remaining_cd:.0f}s remaining")
                     self.status["last_action"] = f"Edge re-entry cooldown ({remaining_cd:.0f}s left)"
                     return
                 # After cooldown, require extra edge premium for re-entry
-                entry_side_edge = dashboard.get("yes_edge", 0) if side == "yes" else dashboard.get("no_edge", 0)
-                required_edge = config.MIN_EDGE_CENTS + config.REENTRY_EDGE_PREMIUM
+                entry_side_edge = yes_edge if side == "yes" else no_edge
+                required_edge = min_edge + cfg.REENTRY_EDGE_PREMIUM
                 if entry_side_edge < required_edge:
-                    log_event("GUARD", f"Edge re-entry premium: edge {entry_side_edge}c < required {required_edge}c (MIN_EDGE {config.MIN_EDGE_CENTS} + premium {config.REENTRY_EDGE_PREMIUM})")
+                    log_event("GUARD", f"Edge re-entry premium: edge {entry_side_edge}c < required {required_edge}c (MIN_EDGE {min_edge} + premium {cfg.REENTRY_EDGE_PREMIUM})")
                     self.status["last_action"] = f"Insufficient edge for re-entry ({entry_side_edge}c < {required_edge}c)"
                     return
 
@@ -1733,58 +2028,56 @@ class TradingBot:
             # - Rule-based: midpoint of spread (balanced fill vs. price improvement)
             extreme_momentum = (
                 self.alpha
-                and abs(self.alpha.delta_momentum) > config.EXTREME_DELTA_THRESHOLD
+                and abs(self.alpha.delta_momentum) > cfg.EXTREME_DELTA_THRESHOLD
             )
             if extreme_momentum and best_ask < 100 and best_bid > 0:
                 # Cross the spread — hit the ask (YES) or bid (NO)
-                price_cents = best_ask if side == "yes" else (100 - best_bid)
+                price_cents = best_ask if side == "yes" else no_ask
                 log_event("ALPHA", f"Extreme momentum ({self.alpha.delta_momentum:+.2f}) — crossing spread at {price_cents}c")
             elif alpha_override and best_ask < 100 and best_bid > 0:
                 # Alpha signals are time-sensitive — cross the spread to ensure fill
-                price_cents = best_ask if side == "yes" else (100 - best_bid)
+                price_cents = best_ask if side == "yes" else no_ask
                 log_event("ALPHA", f"Alpha override — crossing spread at {price_cents}c")
             elif best_ask < 100 and best_bid > 0:
                 if self.paper_mode:
                     # Paper mode: cross spread to get realistic fills (paper can't simulate resting orders)
-                    price_cents = best_ask if side == "yes" else (100 - best_bid)
+                    price_cents = best_ask if side == "yes" else no_ask
                 else:
                     # Live: start at midpoint for faster fills with some price improvement
                     if side == "yes":
                         price_cents = (best_bid + best_ask + 1) // 2
                     else:
-                        no_bid = 100 - best_ask
-                        no_ask = 100 - best_bid
                         price_cents = (no_bid + no_ask + 1) // 2
                     price_cents = max(1, min(99, price_cents))
             else:
                 # One-sided market fallback
-                price_cents = best_bid + 1 if side == "yes" else (100 - best_ask + 1)
+                price_cents = best_bid + 1 if side == "yes" else no_bid + 1
                 price_cents = max(1, min(99, price_cents))
 
             # Respect price guards (avoid lottery tickets AND terrible risk/reward)
             effective_price = price_cents if side == "yes" else (100 - price_cents)
-            if effective_price < config.MIN_CONTRACT_PRICE:
-                log_event("GUARD", f"Price guard: {effective_price}c < {config.MIN_CONTRACT_PRICE}c min")
+            if effective_price < cfg.MIN_CONTRACT_PRICE:
+                log_event("GUARD", f"Price guard: {effective_price}c < {cfg.MIN_CONTRACT_PRICE}c min")
                 self.status["last_action"] = "Price too cheap — holding"
                 return
-            if effective_price > config.MAX_CONTRACT_PRICE:
-                log_event("GUARD", f"Price guard: {effective_price}c > {config.MAX_CONTRACT_PRICE}c max — bad risk/reward")
+            if effective_price > cfg.MAX_CONTRACT_PRICE:
+                log_event("GUARD", f"Price guard: {effective_price}c > {cfg.MAX_CONTRACT_PRICE}c max — bad risk/reward")
                 self.status["last_action"] = f"Price too expensive ({effective_price}c) — holding"
                 return
 
             # Portfolio-wide exposure guard (percentage of current balance)
-            max_exposure = balance * config.MAX_TOTAL_EXPOSURE_PCT / 100.0
+            max_exposure = balance * cfg.MAX_TOTAL_EXPOSURE_PCT / 100.0
             if total_exposure >= max_exposure:
-                log_event("GUARD", f"Exposure guard: ${total_exposure:.2f} >= {config.MAX_TOTAL_EXPOSURE_PCT:.1f}% (${max_exposure:.2f}) limit")
+                log_event("GUARD", f"Exposure guard: ${total_exposure:.2f} >= {cfg.MAX_TOTAL_EXPOSURE_PCT:.1f}% (${max_exposure:.2f}) limit")
                 self.status["last_action"] = f"Max exposure reached (${total_exposure:.2f})"
                 return
 
             # Dynamic contract sizing from balance percentages
             # price_cents is the cost per contract we'd pay
-            position_budget = balance * config.MAX_POSITION_PCT / 100.0
+            position_budget = balance * cfg.MAX_POSITION_PCT / 100.0
             max_position = max(1, int(position_budget / (price_cents / 100.0))) if price_cents > 0 else 1
 
-            order_budget = balance * config.ORDER_SIZE_PCT / 100.0
+            order_budget = balance * cfg.ORDER_SIZE_PCT / 100.0
             order_size = max(1, int(order_budget / (price_cents / 100.0))) if price_cents > 0 else 1
 
             # Re-fetch positions after cancel (fills may have occurred since initial fetch)
@@ -1798,7 +2091,7 @@ class TradingBot:
                 current_qty = abs(my_pos.get("position", 0) or 0)
             remaining_capacity = max_position - current_qty
             if remaining_capacity <= 0:
-                log_event("GUARD", f"Position guard: {current_qty}/{max_position} contracts ({config.MAX_POSITION_PCT:.1f}% of balance)")
+                log_event("GUARD", f"Position guard: {current_qty}/{max_position} contracts ({cfg.MAX_POSITION_PCT:.1f}% of balance)")
                 self.status["last_action"] = f"Max position reached ({current_qty})"
                 return
 
@@ -1807,24 +2100,26 @@ class TradingBot:
             if order:
                 self.status["last_action"] = f"Placed {side.upper()} @ {price_cents}c x{qty}"
                 # Record entry time and edge for edge-exit logic
-                self._entry_ts[ticker] = time.time()
-                entry_edge = dashboard.get("yes_edge", 0) if side == "yes" else dashboard.get("no_edge", 0)
+                self._entry_ts[ticker] = time.monotonic()
+                entry_edge = yes_edge if side == "yes" else no_edge
                 self._entry_edge[ticker] = entry_edge
-                try:
-                    _mid = f"[PAPER] {ticker}" if self.paper_mode else ticker
-                    record_snapshot({
-                        "ts": datetime.now(timezone.utc).isoformat(),
-                        "trade_id": order.get("order_id", f"snap-{int(time.time()*1000)}"),
+                _mid = f"[PAPER] {ticker}" if self.paper_mode else ticker
+                _now = time.time()
+                try:  # order is live; a context failure must not skip the retry below
+                    self._queue_write("snapshot", {
+                        "ts": datetime.fromtimestamp(_now, timezone.utc).isoformat(),
+                        "trade_id": order.get("order_id", f"snap-{int(_now*1000)}"),
                         "market_id": _mid, "action": "BUY", "side": side,
                         "price_cents": price_cents,
                         "quantity": order.get("filled_count", qty),
                         "decision": action, "confidence": confidence,
                         "trigger_type": _trigger_type,
                         "position_qty": current_qty,
-                        **_snap_ctx,
+                        **_snap_ctx(),
                     })
-                except Exception:
-                    pass
+                except Exception as exc:
+                    log_event("ERROR", f"Entry snapshot for {ticker} failed: {exc}")
+                self._entry_snaps[_mid] = {"ts_epoch": _now, "price_cents": price_cents}
                 # Fill-or-cancel: skip retries for spread-crossing orders (already at best price)
                 if not extreme_momentum and not alpha_override:
                     order_id = order.get("order_id")
@@ -1845,6 +2140,22 @@ class TradingBot:
 
     def stop(self):
         self.running = False
+        self._stop_event.set()
+
+    async def stop_and_wait(self, timeout: float = 15.0):
+        """Stop the loop and wait for run() to return.
+
+        A cycle in progress gets `timeout` seconds to finish before the task is
+        cancelled; run() treats cancellation as a normal stop.
+        """
+        self.stop()
+        task = self._run_task
+        if task is None or task.done() or task is asyncio.current_task():
+            return
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+        if not done:
+            task.cancel()
+            await asyncio.wait({task})
 
 
 async def _safe(coro):
@@ -1,10 +1,13 @@
 import asyncio
+import hashlib
+import json
 import time
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI, Request
-from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
+from fastapi import FastAPI, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
@@ -12,12 +15,15 @@ from pydantic import BaseModel
 import config
 
 # Simple TTL cache for REST orderbook fetches (avoids hammering Kalshi API)
-_ob_cache: dict = {"ticker": "", "data": None, "ts": 0.0}
-_OB_CACHE_TTL = 2.0  # seconds
+_ob_cache: dict = {"ticker": "", "data": None, "ts": 0.0, "ttl": 0.0}
+_OB_CACHE_TTL_MIN = 0.4  # seconds — tight books and the final minute
+_OB_CACHE_TTL_MAX = 4.0  # seconds — wide, quiet books
+_OB_STALE_MAX = 30.0     # seconds — oldest REST book served (marked stale) when REST fails
+_ob_inflight: dict[str, asyncio.Task] = {}  # ticker -> REST fetch shared by concurrent polls
 from config import get_tunables, set_tunables, restore_tunables, TUNABLE_FIELDS
 from database import init_db, get_recent_logs, get_latest_decision, get_todays_trades, get_trades_with_pnl, get_setting, set_setting, get_all_unsettled_live_entries, backfill_buy_trades_from_snapshots, get_db
 from alpha_engine import AlphaMonitor
-from trader import TradingBot
+from trader import TradingBot, top_of_book
 
 FRONTEND_DIR = Path(__file__).parent / "frontend" / "dist"
 
@@ -40,60 +46,90 @@ async def lifespan(app: FastAPI):
         bot_task = asyncio.create_task(bot.run())
     yield
     # Shutdown: stop bot if running
-    if bot.running:
-        bot.stop()
-        if bot_task and not bot_task.done():
-            bot_task.cancel()
+    await bot.stop_and_wait(timeout=5.0)
+    await bot.close()
     await alpha_monitor.stop()
 
 
 app = FastAPI(title="Kalshi BTC Auto-Trader", lifespan=lifespan)
 
 
+def _ob_cache_ttl(spread: int, secs_left: float | None) -> float:
+    """How long a REST orderbook stays fresh: ~0.4s per cent of spread, minimum near close."""
+    if secs_left is not None and secs_left < 60:
+        return _OB_CACHE_TTL_MIN
+    return max(_OB_CACHE_TTL_MIN, min(_OB_CACHE_TTL_MAX, spread * 0.4))
+
+
+def _fetch_orderbook_shared(ticker: str) -> asyncio.Task:
+    """Single-flight REST orderbook fetch: concurrent pollers await the same request."""
+    task = _ob_inflight.get(ticker)
+    if task is None:
+        task = asyncio.create_task(bot.fetch_orderbook(ticker))
+        _ob_inflight[ticker] = task
+        task.add_done_callback(lambda _: _ob_inflight.pop(ticker, None))
+    return task
+
+
 # ------------------------------------------------------------------
 # API — consumed by React frontend & JSON clients
 # ------------------------------------------------------------------
 
 @app.get("/api/status")
-async def api_status():
+async def api_status(request: Request):
+    """Status payload with an ETag, so unchanged polls get an empty 304."""
+    resp = JSONResponse(jsonable_encoder(await _status_payload()))
+    etag = f'"{hashlib.blake2b(resp.body, digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    resp.headers.update(headers)
+    return resp
+
+
+async def _status_payload() -> dict:
     decision = bot.status.get("last_decision") or get_latest_decision()
     pos = bot.status.get("active_position")
     pos_label = "None"
     ticker = bot.status.get("current_market") or ""
 
-    # Orderbook: REST API (2s cache) → WS → cycle cache
+    # Orderbook: REST API (0.4-4s cache, by spread / time left) → WS → cycle cache
     # REST is primary because Kalshi WS orderbook_delta often stops sending updates
     ob_source = "cycle"
     live_ob = None
     if ticker:
         now = time.monotonic()
-        if _ob_cache["ticker"] == ticker and (now - _ob_cache["ts"]) < _OB_CACHE_TTL and _ob_cache["data"]:
+        if _ob_cache["ticker"] == ticker and (now - _ob_cache["ts"]) < _ob_cache["ttl"] and _ob_cache["data"]:
             live_ob = _ob_cache["data"]
             ob_source = "rest_cached"
         else:
             try:
-                live_ob = await bot.fetch_orderbook(ticker)
+                # shield: one poller disconnecting must not cancel the others' fetch
+                live_ob = await asyncio.shield(_fetch_orderbook_shared(ticker))
                 _ob_cache["ticker"] = ticker
                 _ob_cache["data"] = live_ob
                 _ob_cache["ts"] = now
+                best_bid, best_ask, _, _ = top_of_book(live_ob)  # memoised for the snapshot below
+                _ob_cache["ttl"] = _ob_cache_ttl(best_ask - best_bid, bot.status.get("seconds_to_close"))
                 ob_source = "rest"
             except Exception:
-                # REST failed — try WS as fallback
-                live_ob = alpha_monitor.get_live_orderbook(ticker) if ticker else None
+                # REST failed — try WS, then the last REST book with its age in the source
+                live_ob = alpha_monitor.get_live_orderbook(ticker)
                 if live_ob:
                     ob_source = "ws"
+                elif (_ob_cache["ticker"] == ticker and _ob_cache["data"]
+                        and now - _ob_cache["ts"] < _OB_STALE_MAX):
+                    live_ob = _ob_cache["data"]
+                    ob_source = f"rest_stale_{int(now - _ob_cache['ts'])}s"
 
     if live_ob:
-        yes_orders = live_ob.get("yes", []) if isinstance(live_ob.get("yes"), list) else []
-        no_orders = live_ob.get("no", []) if isinstance(live_ob.get("no"), list) else []
-        best_bid = max((p for p, q in yes_orders), default=0) if yes_orders else 0
-        best_ask = (100 - max((p for p, q in no_orders), default=0)) if no_orders else 100
+        best_bid, best_ask, yes_depth, no_depth = top_of_book(live_ob)
         ob_snapshot = {
             "best_bid": best_bid,
             "best_ask": best_ask,
             "spread": best_ask - best_bid,
-            "yes_depth": sum(q for _, q in yes_orders),
-            "no_depth": sum(q for _, q in no_orders),
+            "yes_depth": yes_depth,
+            "no_depth": no_depth,
             "source": ob_source,
         }
     else:
@@ -172,10 +208,25 @@ async def api_status():
     }
 
 
+# Last patched dashboard: reused while the bot's dashboard object, the live
+# bid/ask and the patched config values are all unchanged
+_dashboard_cache: dict = {"src": None, "key": None, "db": None}
+
+
 def _patch_dashboard(db: dict | None, best_bid: int, best_ask: int) -> dict | None:
     """Patch dashboard with live data so guards/exits always reflect current config."""
     if not db:
         return db
+    key = (
+        best_bid, best_ask, config.MAX_SPREAD_CENTS, config.STOP_LOSS_CENTS,
+        config.HIT_RUN_PCT, config.PROFIT_TAKE_PCT, config.FREE_ROLL_PRICE,
+        config.EDGE_EXIT_ENABLED, config.EDGE_EXIT_MIN_HOLD_SECS, config.EDGE_EXIT_THRESHOLD_CENTS,
+        config.EDGE_EXIT_COOLDOWN_SECS, config.REENTRY_EDGE_PREMIUM,
+    )
+    # The bot publishes a new dashboard dict each cycle, so identity means "same cycle"
+    if _dashboard_cache["src"] is db and _dashboard_cache["key"] == key:
+        return _dashboard_cache["db"]
+    src = db
     # Shallow copy to avoid mutating bot.status
     db = {**db}
     if db.get("guards"):
@@ -203,9 +254,69 @@ def _patch_dashboard(db: dict | None, best_bid: int, best_ask: int) -> dict | No
     db["edge_exit_threshold"] = config.EDGE_EXIT_THRESHOLD_CENTS
     db["edge_exit_cooldown"] = config.EDGE_EXIT_COOLDOWN_SECS
     db["reentry_edge_premium"] = config.REENTRY_EDGE_PREMIUM
+    _dashboard_cache.update(src=src, key=key, db=db)
     return db
 
 
+_STATUS_STREAM_INTERVAL = 2.0  # seconds between shared payload builds (matches the old 2s poll)
+_status_subs: set[asyncio.Queue] = set()  # one queue per connected /api/status/stream client
+_status_producer: asyncio.Task | None = None
+_status_last: str | None = None  # last payload broadcast, sent to new subscribers on connect
+
+
+async def _status_broadcast():
+    """Build the status payload once per interval and fan it out to all stream clients.
+
+    Runs only while someone is subscribed, so the per-tab cost is a queue put
+    rather than a payload build (and a possible REST orderbook fetch).
+    """
+    global _status_producer, _status_last
+    try:
+        while _status_subs:
+            try:
+                payload = json.dumps(jsonable_encoder(await _status_payload()))
+            except Exception as exc:
+                from database import log_event
+                log_event("ERROR", f"Status stream build failed: {exc}")
+                payload = None
+            if payload is not None and payload != _status_last:
+                _status_last = payload
+                for q in _status_subs:
+                    if q.full():
+                        q.get_nowait()  # slow client: drop the stale payload, keep the newest
+                    q.put_nowait(payload)
+            await asyncio.sleep(_STATUS_STREAM_INTERVAL)
+    finally:
+        _status_producer = None
+        _status_last = None
+
+
+@app.get("/api/status/stream")
+async def api_status_stream(request: Request):
+    """Server-Sent Events feed of the /api/status payload, sent only when it changes."""
+    async def events():
+        global _status_producer
+        q: asyncio.Queue = asyncio.Queue(maxsize=1)
+        if _status_last is not None:
+            q.put_nowait(_status_last)
+        _status_subs.add(q)
+        if _status_producer is None:
+            _status_producer = asyncio.create_task(_status_broadcast())
+        try:
+            while not await request.is_disconnected():
+                try:
+                    payload = await asyncio.wait_for(q.get(), timeout=15.0)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {payload}\n\n"
+        finally:
+            _status_subs.discard(q)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
 @app.get("/api/debug/market")
 async def api_debug_market():
     """Expose raw market data for debugging strike extraction."""
@@ -259,7 +370,8 @@ async def backfill_settlements():
             results.append({"ticker": ticker, "status": "settled"})
         except Exception as exc:
             results.append({"ticker": ticker, "status": "error", "error": str(exc)})
-    # Also backfill BUY records so PnL round-trips work
+    # Also backfill BUY records so PnL round-trips work (needs the SETTLED rows written)
+    await bot.flush_writes()
     buy_backfilled = backfill_buy_trades_from_snapshots()
     return {
         "ok": True,
@@ -299,7 +411,9 @@ async def reconcile_trades(since_utc: str = "2026-02-02T20:00:00Z"):
     from datetime import datetime, timezone
     from database import log_event
     from itertools import chain
-    cutoff = datetime.fromisoformat(since_utc.replace("Z", "+00:00"))
+    from collections import defaultdict
+    from operator import itemgetter
+    cutoff = datetime.fromisoformat(since_utc)
 
     # 1. Fetch all Kalshi fills (paginated)
     all_fills = []
@@ -318,7 +432,7 @@ async def reconcile_trades(since_utc: str = "2026-02-02T20:00:00Z"):
         all_fills.extend(fills)
         cursor = data.get("cursor")
         # Stop if oldest fill is before cutoff
-        oldest = datetime.fromisoformat(fills[-1]["created_time"].replace("Z", "+00:00"))
+        oldest = datetime.fromisoformat(fills[-1]["created_time"])
         if oldest < cutoff:
             break
         if not cursor:
@@ -328,49 +442,63 @@ async def reconcile_trades(since_utc: str = "2026-02-02T20:00:00Z"):
     recent = [
         f for f in all_fills
         if f["ticker"].startswith("KXBTC15M-")
-        and datetime.fromisoformat(f["created_time"].replace("Z", "+00:00")) >= cutoff
+        and datetime.fromisoformat(f["created_time"]) >= cutoff
     ]
 
     # 2. Group fills by market
-    markets: dict[str, list] = {}
+    markets: dict[str, list] = defaultdict(list)
     for f in recent:
-        t = f["ticker"]
-        if t not in markets:
-            markets[t] = []
-        markets[t].append(f)
+        markets[f["ticker"]].append(f)
+
+    # Market results are independent lookups — fetch them concurrently, capped
+    # like the bot's own settlement fetches
+    sem = asyncio.Semaphore(TradingBot._SETTLE_CONCURRENCY)
 
-    # 3. For each market: compute position, cost, and query result
+    async def _market_result(ticker: str) -> tuple[str, str]:
+        try:
+            async with sem:
+                mkt_data = await bot._get(f"/markets/{ticker}")
+            return ticker, mkt_data.get("market", mkt_data).get("result", "")
+        except Exception:
+            return ticker, ""
+
+    market_results = dict(await asyncio.gather(*(_market_result(t) for t in markets)))
+
+    # 3. For each market: compute position, cost, and result
     results = []
     for ticker, fills in sorted(markets.items()):
-        fills.sort(key=lambda x: x["created_time"])
+        fills.sort(key=itemgetter("created_time"))  # in place: step 4 reuses the order
 
-        # Track position and cash flows
+        # Track position and cash flows (one pass over the fills)
         yes_bought = 0
         no_bought = 0
-        total_cost_cents = 0  # cash out
-        sell_fills_detail = []
+        yes_cost_cents = 0  # cash out, per side
+        no_cost_cents = 0
+        yes_sold = 0
+        no_sold = 0
+        # Revenue from sells: on Kalshi, sells are reported at the fill price
+        # For "sell NO" when holding YES: auto-netting means revenue = (100 - no_price) per contract
+        # For "sell YES": revenue = yes_price per contract
+        # The simplest correct model: sell revenue = yes_price * count for ALL sells
+        # because yes_price reflects the YES-equivalent value in every fill
+        sell_revenue_cents = 0
 
         for f in fills:
+            count = f["count"]
             if f["action"] == "buy":
                 if f["side"] == "yes":
-                    yes_bought += f["count"]
-                    total_cost_cents += f["count"] * f["yes_price"]
+                    yes_bought += count
+                    yes_cost_cents += count * f["yes_price"]
                 else:
-                    no_bought += f["count"]
-                    total_cost_cents += f["count"] * f["no_price"]
+                    no_bought += count
+                    no_cost_cents += count * f["no_price"]
             elif f["action"] == "sell":
-                sell_fills_detail.append(f)
-
-        # Process sells: track what was sold on each side
-        yes_sold = sum(f["count"] for f in sell_fills_detail if f["side"] == "yes")
-        no_sold = sum(f["count"] for f in sell_fills_detail if f["side"] == "no")
-
-        # Revenue from sells: on Kalshi, sells are reported at the fill price
-        # For "sell NO" when holding YES: auto-netting means revenue = (100 - no_price) per contract
-        # For "sell YES": revenue = yes_price per contract
-        # The simplest correct model: sell revenue = yes_price * count for ALL sells
-        # because yes_price reflects the YES-equivalent value in every fill
-        sell_revenue_cents = sum(f["count"] * f["yes_price"] for f in sell_fills_detail)
+                if f["side"] == "yes":
+                    yes_sold += count
+                elif f["side"] == "no":
+                    no_sold += count
+                sell_revenue_cents += count * f["yes_price"]
+        total_cost_cents = yes_cost_cents + no_cost_cents
 
         # Remaining position after sells (with auto-netting)
         # Sell YES reduces YES. Sell NO auto-nets with YES (or creates short NO).
@@ -389,14 +517,7 @@ async def reconcile_trades(since_utc: str = "2026-02-02T20:00:00Z"):
             yes_net_with_no = min(excess_yes_sold, no_remaining)
             no_remaining -= yes_net_with_no
 
-        # Query Kalshi for market result
-        market_result = ""
-        try:
-            mkt_data = await bot._get(f"/markets/{ticker}")
-            market_data = mkt_data.get("market", mkt_data)
-            market_result = market_data.get("result", "")
-        except Exception:
-            pass
+        market_result = market_results[ticker]
 
         # Compute settlement value for remaining positions
         settle_cents = 0
@@ -424,9 +545,9 @@ async def reconcile_trades(since_utc: str = "2026-02-02T20:00:00Z"):
         # Effective entry (weighted average cost per contract on the primary side)
         primary_side = "yes" if yes_bought >= no_bought else "no"
         if primary_side == "yes" and yes_bought > 0:
-            avg_entry_cents = sum(f["count"] * f["yes_price"] for f in fills if f["action"] == "buy" and f["side"] == "yes") / yes_bought
+            avg_entry_cents = yes_cost_cents / yes_bought
         elif no_bought > 0:
-            avg_entry_cents = sum(f["count"] * f["no_price"] for f in fills if f["action"] == "buy" and f["side"] == "no") / no_bought
+            avg_entry_cents = no_cost_cents / no_bought
         else:
             avg_entry_cents = 0
 
@@ -446,54 +567,42 @@ async def reconcile_trades(since_utc: str = "2026-02-02T20:00:00Z"):
             "avg_entry_cents": round(avg_entry_cents, 1),
         })
 
-    # 4. Rebuild trades table for live mode
+    # 4. Rebuild trades table for live mode (rows built first, then one
+    # DELETE + executemany in a single transaction)
+    settle_ts = datetime.now(timezone.utc).isoformat()
+    rows = []
+    for mkt in results:
+        ticker = mkt["ticker"]
+
+        # Fills for this market (time-ordered in step 3), recorded individually
+        for f in markets[ticker]:
+            if f["action"] == "buy":
+                fill_side = f["side"]
+                fill_price = f["yes_price"] / 100.0 if fill_side == "yes" else f["no_price"] / 100.0
+                rows.append((f["created_time"], ticker, fill_side, "BUY", fill_price, f["count"], f["order_id"]))
+            elif f["action"] == "sell":
+                # Revenue: use yes_price for YES sells, for NO sells use (100-no_price)/100 = yes_price/100
+                rows.append((f["created_time"], ticker, f["side"], "SELL", f["yes_price"] / 100.0, f["count"], f["order_id"]))
+
+        # Add SETTLE entry for remaining position
+        if mkt["result"]:
+            result = mkt["result"].lower()
+            for settle_side in ("yes", "no"):
+                remaining = mkt["remaining"][settle_side]
+                if remaining > 0:
+                    settle_price = 1.0 if result == settle_side else 0.0
+                    rows.append((settle_ts, ticker, settle_side, "SETTLE", settle_price,
+                                 remaining, f"reconcile-settle-{ticker}"))
+
+    await bot.flush_writes()  # queued live trades must land before the rebuild, not after it
     with get_db() as conn:
         # Clear all live trades
         conn.execute("DELETE FROM trades WHERE market_id NOT LIKE '[PAPER]%'")
-
-        for mkt in results:
-            ticker = mkt["ticker"]
-            side = mkt["primary_side"]
-
-            # Get fills for this market to record individual buys
-            mkt_fills = markets[ticker]
-            for f in sorted(mkt_fills, key=lambda x: x["created_time"]):
-                if f["action"] == "buy":
-                    fill_side = f["side"]
-                    fill_price = f["yes_price"] / 100.0 if fill_side == "yes" else f["no_price"] / 100.0
-                    conn.execute(
-                        "INSERT INTO trades (ts, market_id, side, action, price, quantity, order_id) "
-                        "VALUES (?, ?, ?, 'BUY', ?, ?, ?)",
-                        (f["created_time"], ticker, fill_side, fill_price, f["count"], f["order_id"]),
-                    )
-                elif f["action"] == "sell":
-                    fill_side = f["side"]
-                    # Revenue: use yes_price for YES sells, for NO sells use (100-no_price)/100 = yes_price/100
-                    fill_price = f["yes_price"] / 100.0
-                    conn.execute(
-                        "INSERT INTO trades (ts, market_id, side, action, price, quantity, order_id) "
-                        "VALUES (?, ?, ?, 'SELL', ?, ?, ?)",
-                        (f["created_time"], ticker, fill_side, fill_price, f["count"], f["order_id"]),
-                    )
-
-            # Add SETTLE entry for remaining position
-            if mkt["result"] and (mkt["remaining"]["yes"] > 0 or mkt["remaining"]["no"] > 0):
-                if mkt["remaining"]["yes"] > 0:
-                    settle_price = 1.0 if mkt["result"].lower() == "yes" else 0.0
-                    conn.execute(
-                        "INSERT INTO trades (ts, market_id, side, action, price, quantity, order_id) "
-                        "VALUES (?, ?, 'yes', 'SETTLE', ?, ?, ?)",
-                        (datetime.now(timezone.utc).isoformat(), ticker, settle_price,
-                         mkt["remaining"]["yes"], f"reconcile-settle-{ticker}"),
-                    )
-                if mkt["remaining"]["no"] > 0:
-                    settle_price = 1.0 if mkt["result"].lower() == "no" else 0.0
-                    conn.execute(
-                        "INSERT INTO trades (ts, market_id, side, action, price, quantity, order_id) "
-                        "VALUES (?, ?, 'no', 'SETTLE', ?, ?, ?)",
-                        (datetime.now(timezone.utc).isoformat(), ticker, settle_price,
-                         mkt["remaining"]["no"], f"reconcile-settle-{ticker}"),
-                    )
+        conn.executemany(
+            "INSERT INTO trades (ts, market_id, side, action, price, quantity, order_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
 
     log_event("RECONCILE", f"Reconciled {len(results)} markets from Kalshi fills")
 
@@ -519,7 +628,7 @@ async def reconcile_trades(since_utc: str = "2026-02-02T20:00:00Z"):
 @app.post("/api/start")
 async def start_bot():
     global bot_task
-    if bot.running:
+    if bot.running or (bot_task and not bot_task.done()):
         return {"ok": False, "msg": "Already running"}
     bot_task = asyncio.create_task(bot.run())
     set_setting("bot_running", "1")
@@ -530,7 +639,7 @@ async def start_bot():
 async def stop_bot():
     if not bot.running:
         return {"ok": False, "msg": "Not running"}
-    bot.stop()
+    await bot.stop_and_wait()
     set_setting("bot_running", "0")
     return {"ok": True}
 
@@ -539,11 +648,9 @@ async def stop_bot():
 async def reset_paper():
     if not bot.paper_mode:
         return {"ok": False, "msg": "Not in paper mode"}
-    was_running = bot.running
-    if was_running:
-        bot.stop()
+    if bot.running:
+        await bot.stop_and_wait()
         set_setting("bot_running", "0")
-        await asyncio.sleep(1)
     bot.reset_paper_trading()
     return {"ok": True, "balance": config.PAPER_STARTING_BALANCE}
 
@@ -556,8 +663,6 @@ class EnvRequest(BaseModel):
 async def switch_env(req: EnvRequest):
     if req.env not in ("demo", "live"):
         return {"ok": False, "msg": "Invalid env"}
-    if bot.running:
-        bot.stop()
     await bot.switch_environment(req.env)
     return {"ok": True, "env": req.env}
 
@@ -576,11 +681,17 @@ async def chat(req: ChatRequest):
 # Configuration
 # ------------------------------------------------------------------
 
+# /api/config payload, rebuilt only when config.TUNABLES_VERSION moves
+_config_cache: dict = {"version": -1, "meta": None}
+
+
 @app.get("/api/config")
 async def get_config():
-    values = get_tunables()
-    meta = {k: {**TUNABLE_FIELDS[k], "value": values[k]} for k in TUNABLE_FIELDS}
-    return meta
+    if _config_cache["version"] != config.TUNABLES_VERSION:
+        values = get_tunables()
+        _config_cache["meta"] = {k: {**TUNABLE_FIELDS[k], "value": values[k]} for k in TUNABLE_FIELDS}
+        _config_cache["version"] = config.TUNABLES_VERSION
+    return _config_cache["meta"]
 
 
 @app.post("/api/config")